@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Kiểm tra parity và đo độ trễ của LogisticKernel so với đường sklearn
+Chạy từ thư mục gốc: python models/benchmark_kernel.py
+"""
+import os
+import sys
+import timeit
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from common.inference import FEATURES, LogisticKernel, load_encoded_kernel
+
+DATA_FILE = "data/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+MODEL_PAIRS = [
+    ("logistic_mbgd_model.pkl", "preprocessor.pkl"),
+    ("logistic_model_new.pkl", "preprocessor_new.pkl"),
+]
+FULL_KERNEL = "logistic_full_kernel.json"
+TOLERANCE = 1e-9
+
+
+def load_features():
+    """Đọc toàn bộ Telco CSV giống như spout (TotalCharges rỗng -> 0.0)"""
+    df = pd.read_csv(DATA_FILE)
+    df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors='coerce').fillna(0.0)
+    return df[list(FEATURES)].astype(np.float64)
+
+
+def sklearn_proba(model, preprocessor, frame):
+    """Đường dự đoán cũ: ColumnTransformer + theta hoặc LogisticRegression"""
+    X_processed = preprocessor.transform(frame)
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba(X_processed)[:, 1]
+    X_processed = np.hstack((np.ones((X_processed.shape[0], 1)), X_processed))
+    return 1 / (1 + np.exp(-np.dot(X_processed, model)))
+
+
+def check_parity(model, preprocessor, kernel, frame):
+    """So sánh xác suất và nhãn trên toàn bộ dữ liệu"""
+    expected = sklearn_proba(model, preprocessor, frame)
+    actual = kernel.predict_proba(frame.to_numpy())
+
+    max_diff = float(np.max(np.abs(expected - actual)))
+    label_mismatches = int(np.sum((expected >= 0.5) != (actual >= 0.5)))
+    return max_diff, label_mismatches
+
+
+def benchmark(model, preprocessor, kernel, frame, repeat=2000):
+    """Đo độ trễ mỗi dòng (1 dòng/lần gọi) và thông lượng batch"""
+    tc, mc = frame.iloc[0]
+    row_frame = pd.DataFrame([{'TotalCharges': tc, 'MonthlyCharges': mc}])
+    row = [[tc, mc]]
+    matrix = frame.to_numpy()
+
+    sklearn_row = min(timeit.repeat(lambda: sklearn_proba(model, preprocessor, row_frame),
+                                    number=repeat, repeat=3)) / repeat
+    kernel_row = min(timeit.repeat(lambda: kernel.predict_proba(row),
+                                   number=repeat, repeat=3)) / repeat
+    sklearn_batch = min(timeit.repeat(lambda: sklearn_proba(model, preprocessor, frame),
+                                      number=20, repeat=3)) / 20
+    kernel_batch = min(timeit.repeat(lambda: kernel.predict_proba(matrix),
+                                     number=20, repeat=3)) / 20
+
+    return {
+        'sklearn_row_us': sklearn_row * 1e6,
+        'kernel_row_us': kernel_row * 1e6,
+        'sklearn_batch_rows_per_s': len(frame) / sklearn_batch,
+        'kernel_batch_rows_per_s': len(frame) / kernel_batch,
+    }
+
+
+def check_full_model():
+    """Kiểm tra và đo độ trễ EncodedLogisticKernel (mô hình đầy đủ thuộc tính); True nếu OK.
+
+    Parity với pipeline sklearn được kiểm tra khi huấn luyện (train_full_model.py),
+    vì chỉ kernel đã biên dịch được lưu lại.
+    """
+    kernel = load_encoded_kernel(os.path.join("models", FULL_KERNEL))
+
+    df = pd.read_csv(DATA_FILE)
+    df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors='coerce').fillna(0.0)
+    columns = list(df.columns)
+    rows = list(df.itertuples(index=False))
+
+    print(f"\n{FULL_KERNEL}")
+    try:
+        kernel.validate()
+        probabilities = kernel.predict_proba(rows, columns)
+        ok = bool(np.all(np.isfinite(probabilities)))
+    except ValueError as e:
+        print(f"  invalid kernel: {e}")
+        return False
+    print(f"  {len(rows)} rows scored, predicted churn rate {np.mean(probabilities >= 0.5):.2%} "
+          f"-> {'OK' if ok else 'FAIL'}")
+
+    kernel_row = min(timeit.repeat(lambda: kernel.predict_proba(rows[:1], columns),
+                                   number=2000, repeat=3)) / 2000
+    kernel_batch = min(timeit.repeat(lambda: kernel.predict_proba(rows, columns), number=5, repeat=3)) / 5
+    print(f"  per-row latency: kernel {kernel_row * 1e6:.1f} µs")
+    print(f"  batch throughput: kernel {len(rows) / kernel_batch:,.0f} rows/s")
+    return ok
+
+
+def main():
+    frame = load_features()
+    print(f"Loaded {len(frame)} rows from {DATA_FILE}")
+
+    failed = False
+    for model_file, preprocessor_file in MODEL_PAIRS:
+        model = joblib.load(os.path.join("models", model_file))
+        preprocessor = joblib.load(os.path.join("models", preprocessor_file))
+        kernel = LogisticKernel.from_artifacts(model, preprocessor)
+
+        max_diff, mismatches = check_parity(model, preprocessor, kernel, frame)
+        ok = max_diff <= TOLERANCE and mismatches == 0
+        failed |= not ok
+        print(f"\n{model_file} + {preprocessor_file}")
+        print(f"  parity: max |Δp| = {max_diff:.3e}, label mismatches = {mismatches} -> {'OK' if ok else 'FAIL'}")
+
+        timings = benchmark(model, preprocessor, kernel, frame)
+        print(f"  per-row latency: sklearn {timings['sklearn_row_us']:.1f} µs, "
+              f"kernel {timings['kernel_row_us']:.1f} µs "
+              f"({timings['sklearn_row_us'] / timings['kernel_row_us']:.0f}x)")
+        print(f"  batch throughput: sklearn {timings['sklearn_batch_rows_per_s']:,.0f} rows/s, "
+              f"kernel {timings['kernel_batch_rows_per_s']:,.0f} rows/s")
+
+    if os.path.exists(os.path.join("models", FULL_KERNEL)):
+        failed |= not check_full_model()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
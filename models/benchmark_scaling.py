@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Đo thông lượng của ChurnPredictorFullBolt theo số executor trên một máy.
+Chạy từ thư mục gốc:
+
+    python models/benchmark_scaling.py
+    python models/benchmark_scaling.py --executors 1 2 4 8 16 --rows 400000
+
+Mỗi executor là một process Python riêng như một task multilang của Storm.
+Tuple được chia theo fields grouping trên customerID (hash % số executor). Mỗi
+executor giải mã tuple JSON, chấm điểm theo micro-batch bằng
+EncodedLogisticKernel rồi mã hóa tuple emit thành JSON. Phần JVM/acker không
+được đo, nên con số là giới hạn trên cho phần Python của topology.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+import zlib
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from common.inference import load_encoded_kernel  # noqa: E402
+from common.records import TELCO_COLUMNS, check_header, parse_row  # noqa: E402
+
+DATA_FILE = "data/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+KERNEL_PATH = "models/logistic_full_kernel.json"
+BATCH_SIZE = 256
+# Bố cục của `value` trên stream 'customer', như ChurnPredictorFullBolt
+VALUE_COLUMNS = TELCO_COLUMNS[1:]
+
+
+def load_tuples(rows):
+    """Tuple của stream 'customer' ([customerID, value]), lặp lại dữ liệu Telco cho đủ ``rows`` dòng"""
+    with open(DATA_FILE, newline="") as f:
+        reader = csv.reader(f)
+        check_header(next(reader))
+        records = [parse_row(row) for row in reader]
+
+    tuples = []
+    while len(tuples) < rows:
+        copy = len(tuples) // len(records)
+        for record in records[:rows - len(tuples)]:
+            tuples.append([f"{record.customerID}-{copy}", list(record[1:])])
+    return tuples
+
+
+def partition(customer_id, executors):
+    """Fields grouping: cùng customerID luôn tới cùng một executor"""
+    return zlib.crc32(customer_id.encode()) % executors
+
+
+def _executor(index, executors, rows, barrier, results):
+    kernel = load_encoded_kernel(KERNEL_PATH)
+    # Tuple đến executor dưới dạng message JSON của giao thức multilang
+    messages = [json.dumps({"tuple": values}) for values in load_tuples(rows)
+                if partition(values[0], executors) == index]
+
+    barrier.wait()
+    start = time.perf_counter()
+    batch = []
+    emitted = 0
+    for message in messages:
+        batch.append(json.loads(message)["tuple"])
+        if len(batch) == BATCH_SIZE or emitted + len(batch) == len(messages):
+            probabilities = kernel.predict_proba([value for _, value in batch], VALUE_COLUMNS)
+            for (customer_id, _), probability in zip(batch, probabilities):
+                json.dumps({"command": "emit", "tuple": [customer_id, int(probability >= 0.5), float(probability)]})
+            emitted += len(batch)
+            batch = []
+    results.put((index, len(messages), start, time.perf_counter()))
+
+
+def run(executors, rows):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(executors)
+    results = context.Queue()
+    processes = [context.Process(target=_executor, args=(index, executors, rows, barrier, results))
+                 for index in range(executors)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    counts = [count for _, count, _, _ in reports]
+    elapsed = max(end for *_, end in reports) - min(start for _, _, start, _ in reports)
+    skew = max(counts) / (sum(counts) / len(counts))
+    return sum(counts) / elapsed, skew
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput of the full-feature predictor vs executor count")
+    parser.add_argument("--executors", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rows", type=int, default=200000)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"{args.rows} tuples, fields grouping on customerID, {os.cpu_count()} CPUs")
+    print(f"{'executors':>9}  {'tuples/s':>10}  {'speedup':>7}  {'efficiency':>10}  {'skew':>5}")
+
+    baseline = None
+    for executors in args.executors:
+        throughput, skew = run(executors, args.rows)
+        baseline = baseline or throughput / executors
+        speedup = throughput / baseline
+        print(f"{executors:>9}  {throughput:>10,.0f}  {speedup:>6.2f}x  {speedup / executors:>10.0%}  {skew:>5.2f}")
+
+
+if __name__ == '__main__':
+    main()
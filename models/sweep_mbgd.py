@@ -0,0 +1,178 @@
+"""
+Dò siêu tham số (lr, batch_size, momentum, lambda_reg) cho mini-batch GD của train_model.py.
+
+    python models/sweep_mbgd.py                                   # lưới mặc định
+    python models/sweep_mbgd.py --lr 0.0001 0.001 0.01 --momentum 0.8 0.9
+    python models/sweep_mbgd.py --samples 64                      # lấy ngẫu nhiên 64 cấu hình
+    python models/sweep_mbgd.py --no-promote
+
+Dữ liệu được tiền xử lý một lần; ma trận train/validation nằm trong shared memory
+và các worker của Pool chỉ nhận tên vùng nhớ, không phải bản sao pickle của dữ liệu.
+Kết quả xếp hạng theo validation log loss được ghi vào models/sweep_results.csv,
+cấu hình tốt nhất được đánh giá trên tập test và lưu thành logistic_mbgd_model.pkl.
+"""
+import argparse
+import csv
+import itertools
+import os
+import time
+from multiprocessing import Pool, cpu_count, shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, classification_report
+import joblib
+
+from train_model import (DATA_PATH, MODEL_PATH, PREPROCESSOR_PATH, add_intercept, clean, features,
+                         loss_function, make_preprocessor, sigmoid_function, train_mbgd)
+
+RESULTS_PATH = "models/sweep_results.csv"
+RESULT_FIELDS = ["rank", "lr", "batch_size", "momentum", "lambda_reg", "epochs", "val_loss", "val_accuracy",
+                 "train_secs"]
+
+# Mảng dùng chung trong mỗi worker, gắn vào shared memory bởi _attach()
+_shared = {}
+
+
+def share(arrays):
+    """Copy arrays into shared memory; returns (blocks, specs) where specs are picklable"""
+    blocks, specs = [], {}
+    for name, array in arrays.items():
+        block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+
+def _attach(specs):
+    """Pool initializer: map the shared arrays without copying them"""
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _shared[name] = (block, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+
+def _run(config):
+    X_train, y_train = _shared["X_train"][1], _shared["y_train"][1]
+    X_val, y_val = _shared["X_val"][1], _shared["y_val"][1]
+
+    start = time.perf_counter()
+    theta, losses = train_mbgd(X_train, y_train, lr=config["lr"], num_iter=config["epochs"],
+                               batch_size=config["batch_size"], momentum=config["momentum"],
+                               lambda_reg=config["lambda_reg"], verbose=False)
+    seconds = time.perf_counter() - start
+
+    y_hat = sigmoid_function(X_val @ theta)
+    val_loss = loss_function(y_hat, y_val, theta, lambda_reg=0.0)  # log loss, không regularization
+    if not np.isfinite(val_loss):
+        val_loss = float("inf")
+    return dict(config, epochs=len(losses), val_loss=float(val_loss),
+                val_accuracy=float(accuracy_score(y_val, np.round(y_hat))), train_secs=seconds, theta=theta)
+
+
+def make_configs(args):
+    """Lưới đầy đủ, hoặc --samples cấu hình ngẫu nhiên (lr, lambda_reg theo log-uniform)"""
+    if args.samples:
+        rng = np.random.default_rng(args.seed)
+        return [{
+            "lr": float(10 ** rng.uniform(np.log10(min(args.lr)), np.log10(max(args.lr)))),
+            "batch_size": int(rng.choice(args.batch_size)),
+            "momentum": float(rng.choice(args.momentum)),
+            "lambda_reg": float(10 ** rng.uniform(np.log10(min(args.lambda_reg)), np.log10(max(args.lambda_reg)))),
+            "epochs": args.epochs,
+        } for _ in range(args.samples)]
+
+    return [{"lr": lr, "batch_size": batch_size, "momentum": momentum, "lambda_reg": lambda_reg,
+             "epochs": args.epochs}
+            for lr, batch_size, momentum, lambda_reg in itertools.product(
+                args.lr, args.batch_size, args.momentum, args.lambda_reg)]
+
+
+def write_results(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for rank, result in enumerate(results, start=1):
+            writer.writerow(dict(result, rank=rank))
+
+
+def promote(theta, preprocessor, model_path, preprocessor_path):
+    """Ghi file tạm rồi os.replace: bolt đang chạy (ModelRegistry) không bao giờ đọc file ghi dở"""
+    for obj, path in ((preprocessor, preprocessor_path), (theta, model_path)):
+        tmp_path = f"{path}.tmp"
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hyper-parameter sweep for the mini-batch GD churn model")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--lr", type=float, nargs="+", default=[0.00009, 0.001, 0.01, 0.1])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[64, 128, 512])
+    parser.add_argument("--momentum", type=float, nargs="+", default=[0.0, 0.9])
+    parser.add_argument("--lambda-reg", type=float, nargs="+", default=[0.001, 0.01])
+    parser.add_argument("--epochs", type=int, default=500, help="Max epochs per configuration (early stopping applies)")
+    parser.add_argument("--samples", type=int, default=0,
+                        help="Random configurations drawn from the ranges above instead of the full grid")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=cpu_count())
+    parser.add_argument("--results", default=RESULTS_PATH)
+    parser.add_argument("--no-promote", action="store_true", help="Only write the results table")
+    parser.add_argument("--model-out", default=MODEL_PATH)
+    parser.add_argument("--preprocessor-out", default=PREPROCESSOR_PATH)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    df = clean(pd.read_csv(args.data, usecols=features + ["Churn"]))
+    preprocessor = make_preprocessor()
+    X = add_intercept(preprocessor.fit_transform(df[features]))
+    y = df["Churn"].values
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_train, X_val, y_train, y_val = train_test_split(X_train, y_train, test_size=0.2, random_state=42,
+                                                      stratify=y_train)
+
+    configs = make_configs(args)
+    print(f"Sweeping {len(configs)} configurations on {args.workers} workers "
+          f"({len(X_train)} train / {len(X_val)} validation rows)")
+
+    blocks, specs = share({"X_train": X_train, "y_train": y_train, "X_val": X_val, "y_val": y_val})
+    start = time.perf_counter()
+    try:
+        with Pool(args.workers, initializer=_attach, initargs=(specs,)) as pool:
+            results = []
+            for result in pool.imap_unordered(_run, configs):
+                results.append(result)
+                print(f"[{len(results)}/{len(configs)}] lr={result['lr']:.6g} batch_size={result['batch_size']} "
+                      f"momentum={result['momentum']} lambda_reg={result['lambda_reg']:.6g} "
+                      f"-> val_loss={result['val_loss']:.6f} ({result['train_secs']:.2f}s)")
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda result: (result["val_loss"], -result["val_accuracy"]))
+    write_results(results, args.results)
+    print(f"\n{len(results)} configurations in {elapsed:.2f}s "
+          f"({sum(r['train_secs'] for r in results):.2f}s of training); results in {args.results}")
+
+    best = results[0]
+    print(f"Best: lr={best['lr']:.6g} batch_size={best['batch_size']} momentum={best['momentum']} "
+          f"lambda_reg={best['lambda_reg']:.6g} val_loss={best['val_loss']:.6f}")
+
+    # Đánh giá trên tập kiểm tra
+    y_pred = np.round(sigmoid_function(X_test @ best["theta"]))
+    print(f'Test accuracy: {accuracy_score(y_test, y_pred):.4f}')
+    print(classification_report(y_test, y_pred))
+
+    if not args.no_promote:
+        promote(best["theta"], preprocessor, args.model_out, args.preprocessor_out)
+        print(f"Promoted best model to {args.model_out}")
+
+
+if __name__ == '__main__':
+    main()
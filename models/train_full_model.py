@@ -0,0 +1,116 @@
+"""
+Huấn luyện mô hình churn trên toàn bộ thuộc tính khách hàng (cho ChurnPredictorFullBolt).
+
+    python models/train_full_model.py
+
+Cột số (tenure, MonthlyCharges, TotalCharges, SeniorCitizen) được chuẩn hóa,
+cột phân loại (Contract, InternetService, PaymentMethod, ...) được one-hot.
+Sau khi huấn luyện, mô hình được biên dịch thành EncodedLogisticKernel và kiểm
+tra parity với pipeline sklearn trên toàn bộ dữ liệu trước khi lưu
+models/logistic_full_kernel.json. File JSON chỉ chứa trọng số và bảng tra, nên
+bolt không phụ thuộc phiên bản scikit-learn dùng để huấn luyện.
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report
+
+from train_model import DATA_PATH, Timer
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from common.inference import EncodedLogisticKernel, save_encoded_kernel  # noqa: E402
+
+KERNEL_PATH = "models/logistic_full_kernel.json"
+
+NUMERIC_FEATURES = ['tenure', 'MonthlyCharges', 'TotalCharges', 'SeniorCitizen']
+CATEGORICAL_FEATURES = ['gender', 'Partner', 'Dependents', 'PhoneService', 'MultipleLines', 'InternetService',
+                        'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV',
+                        'StreamingMovies', 'Contract', 'PaperlessBilling', 'PaymentMethod']
+TOLERANCE = 1e-9
+
+
+def load_data(path):
+    """Đọc Telco CSV; TotalCharges rỗng -> 0.0 giống như spout (common.records)"""
+    df = pd.read_csv(path)
+    df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors='coerce').fillna(0.0)
+    df = df.dropna(subset=["Churn"])
+    X = df[NUMERIC_FEATURES + CATEGORICAL_FEATURES]
+    y = (df["Churn"] == "Yes").astype(int).values
+    return X, y
+
+
+def make_preprocessor():
+    return ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), NUMERIC_FEATURES),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES)
+        ])
+
+
+def check_parity(model, preprocessor, kernel, X):
+    """So sánh kernel (lookup table + gather) với pipeline sklearn trên toàn bộ X"""
+    expected = model.predict_proba(preprocessor.transform(X))[:, 1]
+    actual = kernel.predict_proba(X.itertuples(index=False), list(X.columns))
+    return float(np.max(np.abs(expected - actual)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the full-feature churn model")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--C", type=float, default=1.0, help="Inverse L2 regularization strength")
+    parser.add_argument("--kernel-out", default=KERNEL_PATH)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    timer = Timer()
+
+    with timer.phase("load"):
+        X, y = load_data(args.data)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    with timer.phase("train"):
+        preprocessor = make_preprocessor()
+        model = LogisticRegression(C=args.C, max_iter=1000)
+        model.fit(preprocessor.fit_transform(X_train), y_train)
+
+    with timer.phase("evaluate"):
+        y_pred = model.predict(preprocessor.transform(X_test))
+        # Mô hình 2 thuộc tính (TotalCharges, MonthlyCharges) trên cùng phép chia để so sánh
+        baseline_columns = ['TotalCharges', 'MonthlyCharges']
+        baseline_scaler = StandardScaler().fit(X_train[baseline_columns])
+        baseline = LogisticRegression(C=args.C).fit(baseline_scaler.transform(X_train[baseline_columns]), y_train)
+        y_baseline = baseline.predict(baseline_scaler.transform(X_test[baseline_columns]))
+
+    print(f'Accuracy: {accuracy_score(y_test, y_pred):.4f} '
+          f'(TotalCharges + MonthlyCharges only: {accuracy_score(y_test, y_baseline):.4f})')
+    print(classification_report(y_test, y_pred))
+
+    with timer.phase("parity"):
+        # Parity được đo trên kernel đọc lại từ JSON, tức đúng thứ bolt sẽ nạp
+        kernel = EncodedLogisticKernel.from_state(
+            json.loads(json.dumps(EncodedLogisticKernel.from_artifacts(model, preprocessor).state())))
+        max_diff = check_parity(model, preprocessor, kernel, X)
+    print(f"Kernel parity: max |Δp| = {max_diff:.3e}")
+    if max_diff > TOLERANCE:
+        sys.exit("❌ EncodedLogisticKernel does not match the sklearn pipeline; kernel not saved")
+
+    # Lưu kernel đã biên dịch
+    with timer.phase("save"):
+        save_encoded_kernel(kernel, args.kernel_out)
+    print(f"Kernel đã được lưu thành công: {args.kernel_out}")
+
+    timer.report(len(X_train))
+
+
+if __name__ == '__main__':
+    main()
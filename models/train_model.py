@@ -1,123 +1,376 @@
+"""
+Huấn luyện mô hình logistic regression (TotalCharges, MonthlyCharges) cho ChurnPredictorBolt.
+
+    python models/train_model.py                        # Newton/IRLS, có biểu đồ
+    python models/train_model.py --headless             # không mở cửa sổ matplotlib
+    python models/train_model.py --solver lbfgs
+    python models/train_model.py --solver mbgd          # mini-batch GD như trước
+    python models/train_model.py --chunksize 200000     # đọc CSV/Parquet theo từng khối (out-of-core)
+
+Cả ba solver tối ưu cùng một hàm mất mát: log loss trung bình + (lambda_reg / 2) * ||theta||^2.
+Kết quả được lưu vào models/logistic_mbgd_model.pkl và models/preprocessor.pkl.
+"""
+import argparse
+import os
+import time
+from contextlib import contextmanager
+
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler
 from sklearn.compose import ColumnTransformer
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
-import seaborn as sns
 import joblib
 
-# Bước 1: Đọc dữ liệu từ file CSV
-df = pd.read_csv("data/WA_Fn-UseC_-Telco-Customer-Churn.csv")
-
-df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors='coerce')
-df = df.dropna(subset=["TotalCharges", "Churn"])
-df["Churn"] = (df["Churn"] == "Yes").astype(int)
+DATA_PATH = "data/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+MODEL_PATH = "models/logistic_mbgd_model.pkl"
+PREPROCESSOR_PATH = "models/preprocessor.pkl"
 
 # Chọn đặc trưng và nhãn (chỉ sử dụng 2 trường: MonthlyCharges và TotalCharges)
 features = ['TotalCharges', 'MonthlyCharges']
-X = df[features]
-y = df["Churn"].values
-
-# Xử lý dữ liệu số
-numeric_features = ['TotalCharges', 'MonthlyCharges']
-numeric_transformer = StandardScaler()
-
-# Không cần xử lý dữ liệu phân loại vì không có trường phân loại nào
-preprocessor = ColumnTransformer(
-    transformers=[
-        ('num', numeric_transformer, numeric_features)
-    ])
-
-# Tiền xử lý dữ liệu
-X_processed = preprocessor.fit_transform(X)
-
-# Thêm hệ số chặn
-X_processed = np.hstack((np.ones((X_processed.shape[0], 1)), X_processed))  # Thêm hệ số chặn
-
-# Chia dữ liệu thành tập huấn luyện và kiểm tra
-X_train, X_test, y_train, y_test = train_test_split(X_processed, y, test_size=0.2, random_state=42, stratify=y)
-
-# Khởi tạo tham số
-np.random.seed(42)
-theta = np.zeros(X_train.shape[1])
-lr = 0.00009  # Tăng tốc độ học để cập nhật nhanh hơn
-num_iter = 5000  # Tăng số lần lặp
-batch_size = 128  # Tăng batch size để giảm nhiễu
-momentum = 0.9  # Giữ lại momentum để tối ưu
-lambda_reg = 0.01  # Regularization để tránh overfitting
-batch_losses = []
+
+
+class Timer:
+    """Ghi lại thời gian của từng bước cho báo cáo cuối"""
+
+    def __init__(self):
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self, rows=None):
+        total = sum(seconds for _, seconds in self.phases)
+        print("\n⏱  Timing report")
+        for name, seconds in self.phases:
+            print(f"  {name:<12} {seconds:9.3f}s")
+        print(f"  {'total':<12} {total:9.3f}s")
+        if rows:
+            print(f"  {rows} rows, {rows / total:,.0f} rows/s")
+
 
 # Hàm sigmoid
 def sigmoid_function(z):
     return 1 / (1 + np.exp(-z))
 
+
 # Hàm mất mát (thêm regularization L2)
 def loss_function(y_hat, y, theta, lambda_reg=0.01):
+    y_hat = np.clip(y_hat, 1e-15, 1 - 1e-15)
     loss = (-y*np.log(y_hat) - (1 - y)*np.log(1 - y_hat)).mean()
     reg = (lambda_reg / 2) * np.sum(theta**2)  # Ridge Regularization
     return loss + reg
 
-# Huấn luyện với Mini-Batch Gradient Descent có Momentum và Early Stopping
-N = X_train.shape[0]
-velocity = np.zeros_like(theta)
-early_stopping_threshold = 50  # Số lần không cải thiện loss trước khi dừng
-best_loss = float('inf')
-no_improvement = 0
-
-for epoch in range(num_iter):
-    shuffled_indices = np.random.permutation(N)
-    X_train = X_train[shuffled_indices]
-    y_train = y_train[shuffled_indices]
-    
-    for i in range(0, N, batch_size):
-        X_batch = X_train[i:i+batch_size]
-        y_batch = y_train[i:i+batch_size]
-        
-        y_hat = sigmoid_function(np.dot(X_batch, theta))
-        gradient = (np.dot(X_batch.T, (y_hat - y_batch)) / batch_size) + lambda_reg * theta  # Thêm L2
-        
-        # Cập nhật theta bằng momentum
-        velocity = momentum * velocity - lr * gradient
-        theta += velocity
-    
-    # Tính loss
-    current_loss = loss_function(y_hat, y_batch, theta)
-    batch_losses.append(current_loss)
-    
-    # Kiểm tra Early Stopping
-    if current_loss < best_loss:
-        best_loss = current_loss
-        no_improvement = 0
+
+def clean(df):
+    """Ép kiểu TotalCharges, bỏ dòng thiếu và mã hóa nhãn Churn"""
+    df = df.copy()
+    df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors='coerce')
+    df = df.dropna(subset=["TotalCharges", "Churn"])
+    df["Churn"] = (df["Churn"] == "Yes").astype(int)
+    return df
+
+
+def make_preprocessor():
+    # Không cần xử lý dữ liệu phân loại vì không có trường phân loại nào
+    return ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), features)
+        ])
+
+
+def add_intercept(X):
+    return np.hstack((np.ones((X.shape[0], 1)), X))
+
+
+# ---------------------------------------------------------------------------
+# Solvers (in-memory)
+# ---------------------------------------------------------------------------
+
+def train_mbgd(X_train, y_train, lr=0.00009, num_iter=5000, batch_size=128, momentum=0.9,
+               lambda_reg=0.01, early_stopping_threshold=50, seed=42, verbose=True):
+    """Mini-Batch Gradient Descent có Momentum và Early Stopping"""
+    rng = np.random.default_rng(seed)
+    theta = np.zeros(X_train.shape[1])
+    velocity = np.zeros_like(theta)
+    N = X_train.shape[0]
+    batch_losses = []
+    best_loss = float('inf')
+    no_improvement = 0
+
+    for epoch in range(num_iter):
+        # Chỉ hoán vị chỉ số, không sao chép X_train mỗi epoch
+        shuffled_indices = rng.permutation(N)
+
+        for i in range(0, N, batch_size):
+            batch = shuffled_indices[i:i+batch_size]
+            X_batch = X_train[batch]
+            y_batch = y_train[batch]
+
+            y_hat = sigmoid_function(X_batch @ theta)
+            gradient = (X_batch.T @ (y_hat - y_batch)) / batch_size + lambda_reg * theta  # Thêm L2
+
+            # Cập nhật theta bằng momentum
+            velocity = momentum * velocity - lr * gradient
+            theta += velocity
+
+        # Tính loss
+        current_loss = loss_function(y_hat, y_batch, theta, lambda_reg)
+        batch_losses.append(current_loss)
+
+        # Kiểm tra Early Stopping
+        if current_loss < best_loss:
+            best_loss = current_loss
+            no_improvement = 0
+        else:
+            no_improvement += 1
+
+        if no_improvement >= early_stopping_threshold:
+            if verbose:
+                print(f"Stopping early at epoch {epoch} due to no improvement.")
+            break
+
+    return theta, batch_losses
+
+
+def logistic_objective(theta, X, y, lambda_reg=0.01):
+    """(loss, gradient) trên toàn bộ tập huấn luyện"""
+    y_hat = sigmoid_function(X @ theta)
+    gradient = X.T @ (y_hat - y) / X.shape[0] + lambda_reg * theta
+    return loss_function(y_hat, y, theta, lambda_reg), gradient
+
+
+def train_newton(X_train, y_train, lambda_reg=0.01, max_iter=50, tol=1e-10):
+    """Newton/IRLS: mỗi bước giải một hệ (d x d) với Hessian của log loss"""
+    theta = np.zeros(X_train.shape[1])
+    losses = []
+    n = X_train.shape[0]
+    for _ in range(max_iter):
+        y_hat = sigmoid_function(X_train @ theta)
+        gradient = X_train.T @ (y_hat - y_train) / n + lambda_reg * theta
+        weights = y_hat * (1 - y_hat)
+        hessian = (X_train.T * weights) @ X_train / n + lambda_reg * np.eye(len(theta))
+        losses.append(loss_function(y_hat, y_train, theta, lambda_reg))
+        step = np.linalg.solve(hessian, gradient)
+        theta -= step
+        if np.max(np.abs(step)) < tol:
+            break
+    return theta, losses
+
+
+def train_lbfgs(X_train, y_train, lambda_reg=0.01, max_iter=500, tol=1e-10):
+    """Full-batch L-BFGS (scipy) trên cùng hàm mất mát"""
+    from scipy.optimize import minimize
+
+    losses = []
+    result = minimize(logistic_objective, np.zeros(X_train.shape[1]), args=(X_train, y_train, lambda_reg),
+                      jac=True, method="L-BFGS-B", tol=tol, options={"maxiter": max_iter},
+                      callback=lambda theta: losses.append(logistic_objective(theta, X_train, y_train, lambda_reg)[0]))
+    return result.x, losses
+
+
+# ---------------------------------------------------------------------------
+# Out-of-core (chunked) training
+# ---------------------------------------------------------------------------
+
+def read_chunks(path, chunksize):
+    """Khối DataFrame (features + Churn) từ một CSV, một file Parquet hoặc thư mục part-*.parquet"""
+    columns = features + ["Churn"]
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        paths = [path] if not os.path.isdir(path) else sorted(
+            os.path.join(path, name) for name in os.listdir(path) if name.endswith(".parquet"))
+        for part in paths:
+            for batch in pq.ParquetFile(part).iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+def iter_chunks(path, chunksize, test_size=0.2, seed=42):
+    """(X_train, y_train, X_test, y_test) từng khối; chia train/test cố định theo số thứ tự khối"""
+    for number, chunk in enumerate(read_chunks(path, chunksize)):
+        chunk = clean(chunk)
+        is_test = np.random.default_rng([seed, number]).random(len(chunk)) < test_size
+        X = chunk[features]
+        y = chunk["Churn"].to_numpy()
+        yield X[~is_test], y[~is_test], X[is_test], y[is_test]
+
+
+def fit_preprocessor_chunked(path, chunksize, test_size=0.2, seed=42):
+    """Một lượt đọc: StandardScaler.partial_fit trên phần train của mọi khối"""
+    scaler = StandardScaler()
+    first = None
+    rows = 0
+    for X_train, _, _, _ in iter_chunks(path, chunksize, test_size, seed):
+        if len(X_train) == 0:
+            continue
+        if first is None:
+            first = X_train
+        scaler.partial_fit(X_train.to_numpy())
+        rows += len(X_train)
+    if first is None:
+        raise ValueError(f"No training rows in {path}")
+
+    # ColumnTransformer được fit trên khối đầu rồi gán lại thống kê của toàn bộ dữ liệu
+    preprocessor = make_preprocessor()
+    preprocessor.fit(first)
+    fitted = preprocessor.named_transformers_['num']
+    for attribute in ("mean_", "var_", "scale_", "n_samples_seen_"):
+        setattr(fitted, attribute, getattr(scaler, attribute))
+    return preprocessor, rows
+
+
+def train_newton_chunked(path, preprocessor, chunksize, lambda_reg=0.01, max_iter=50, tol=1e-10,
+                         test_size=0.2, seed=42):
+    """Newton/IRLS ngoài bộ nhớ: mỗi vòng lặp cộng dồn gradient và Hessian qua các khối"""
+    theta = None
+    losses = []
+    for _ in range(max_iter):
+        gradient = hessian = None
+        loss_sum = 0.0
+        n = 0
+        for X_train, y_train, _, _ in iter_chunks(path, chunksize, test_size, seed):
+            if len(X_train) == 0:
+                continue
+            X = add_intercept(preprocessor.transform(X_train))
+            if theta is None:
+                theta = np.zeros(X.shape[1])
+            if gradient is None:
+                gradient = np.zeros_like(theta)
+                hessian = np.zeros((len(theta), len(theta)))
+            y_hat = sigmoid_function(X @ theta)
+            gradient += X.T @ (y_hat - y_train)
+            hessian += (X.T * (y_hat * (1 - y_hat))) @ X
+            clipped = np.clip(y_hat, 1e-15, 1 - 1e-15)
+            loss_sum += float(-(y_train * np.log(clipped) + (1 - y_train) * np.log(1 - clipped)).sum())
+            n += len(y_train)
+
+        gradient = gradient / n + lambda_reg * theta
+        hessian = hessian / n + lambda_reg * np.eye(len(theta))
+        losses.append(loss_sum / n + (lambda_reg / 2) * np.sum(theta**2))
+        step = np.linalg.solve(hessian, gradient)
+        theta -= step
+        if np.max(np.abs(step)) < tol:
+            break
+    return theta, losses
+
+
+def predict_chunked(path, preprocessor, theta, chunksize, test_size=0.2, seed=42):
+    """Dự đoán phần test của mọi khối"""
+    y_test, y_pred = [], []
+    for _, _, X_test, y_chunk in iter_chunks(path, chunksize, test_size, seed):
+        if len(X_test) == 0:
+            continue
+        y_pred.append(np.round(sigmoid_function(add_intercept(preprocessor.transform(X_test)) @ theta)))
+        y_test.append(y_chunk)
+    return np.concatenate(y_test), np.concatenate(y_pred)
+
+
+# ---------------------------------------------------------------------------
+
+def plot_results(losses, y_test, y_pred):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Vẽ biểu đồ mất mát
+    plt.plot(losses)
+    plt.xlabel("Iterations")
+    plt.ylabel("Loss")
+    plt.title("Loss over iterations")
+    plt.show()
+
+    sns.heatmap(confusion_matrix(y_test, y_pred), annot=True, fmt='d', cmap='Blues')
+    plt.xlabel("Predicted")
+    plt.ylabel("Actual")
+    plt.title("Confusion Matrix")
+    plt.show()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the churn logistic regression model")
+    parser.add_argument("--data", default=DATA_PATH,
+                        help="Telco churn CSV (with --chunksize also a Parquet file or directory of parts)")
+    parser.add_argument("--solver", choices=("newton", "lbfgs", "mbgd"), default="newton")
+    parser.add_argument("--chunksize", type=int, default=0,
+                        help="Read the CSV in chunks of this many rows (newton only); 0 loads it in memory")
+    parser.add_argument("--headless", action="store_true", help="Do not show plots")
+    parser.add_argument("--lambda-reg", type=float, default=0.01, help="L2 regularization")
+    parser.add_argument("--max-iter", type=int, default=50, help="Newton / L-BFGS iterations")
+    parser.add_argument("--tol", type=float, default=1e-10)
+    parser.add_argument("--lr", type=float, default=0.00009, help="mbgd learning rate")
+    parser.add_argument("--epochs", type=int, default=5000, help="mbgd epochs")
+    parser.add_argument("--batch-size", type=int, default=128, help="mbgd batch size")
+    parser.add_argument("--model-out", default=MODEL_PATH)
+    parser.add_argument("--preprocessor-out", default=PREPROCESSOR_PATH)
+    args = parser.parse_args(argv)
+    if args.chunksize and args.solver != "newton":
+        parser.error("--chunksize is only supported with --solver newton")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    timer = Timer()
+
+    if args.chunksize:
+        with timer.phase("preprocess"):
+            preprocessor, rows = fit_preprocessor_chunked(args.data, args.chunksize)
+        with timer.phase("train"):
+            theta, losses = train_newton_chunked(args.data, preprocessor, args.chunksize,
+                                                 args.lambda_reg, args.max_iter, args.tol)
+        with timer.phase("evaluate"):
+            y_test, y_pred = predict_chunked(args.data, preprocessor, theta, args.chunksize)
     else:
-        no_improvement += 1
-    
-    if no_improvement >= early_stopping_threshold:
-        print(f"Stopping early at epoch {epoch} due to no improvement.")
-        break
-
-# Vẽ biểu đồ mất mát
-plt.plot(batch_losses)
-plt.xlabel("Iterations")
-plt.ylabel("Loss")
-plt.title("Loss over iterations")
-plt.show()
-
-# Đánh giá trên tập kiểm tra
-y_pred_prob = sigmoid_function(np.dot(X_test, theta))
-y_pred = np.round(y_pred_prob)
-
-print(f'Accuracy: {accuracy_score(y_test, y_pred):.4f}')
-print(classification_report(y_test, y_pred))
-
-sns.heatmap(confusion_matrix(y_test, y_pred), annot=True, fmt='d', cmap='Blues')
-plt.xlabel("Predicted")
-plt.ylabel("Actual")
-plt.title("Confusion Matrix")
-plt.show()
-
-# Lưu mô hình và scaler
-joblib.dump(theta, "models/logistic_mbgd_model.pkl")
-joblib.dump(preprocessor, "models/preprocessor.pkl")
-print("Mô hình và bộ xử lý đã được lưu thành công!")
+        # Bước 1: Đọc dữ liệu từ file CSV
+        with timer.phase("load"):
+            df = clean(pd.read_csv(args.data, usecols=features + ["Churn"]))
+            X = df[features]
+            y = df["Churn"].values
+
+        with timer.phase("preprocess"):
+            preprocessor = make_preprocessor()
+            X_processed = add_intercept(preprocessor.fit_transform(X))  # Thêm hệ số chặn
+            # Chia dữ liệu thành tập huấn luyện và kiểm tra
+            X_train, X_test, y_train, y_test = train_test_split(
+                X_processed, y, test_size=0.2, random_state=42, stratify=y)
+            rows = len(X_train)
+
+        with timer.phase("train"):
+            if args.solver == "newton":
+                theta, losses = train_newton(X_train, y_train, args.lambda_reg, args.max_iter, args.tol)
+            elif args.solver == "lbfgs":
+                theta, losses = train_lbfgs(X_train, y_train, args.lambda_reg, args.max_iter, args.tol)
+            else:
+                theta, losses = train_mbgd(X_train, y_train, lr=args.lr, num_iter=args.epochs,
+                                           batch_size=args.batch_size, lambda_reg=args.lambda_reg)
+
+        # Đánh giá trên tập kiểm tra
+        with timer.phase("evaluate"):
+            y_pred = np.round(sigmoid_function(X_test @ theta))
+
+    print(f"Solver: {args.solver}, {len(losses)} iterations, final loss {losses[-1]:.6f}")
+    print(f'Accuracy: {accuracy_score(y_test, y_pred):.4f}')
+    print(classification_report(y_test, y_pred))
+
+    # Lưu mô hình và scaler
+    with timer.phase("save"):
+        joblib.dump(theta, args.model_out)
+        joblib.dump(preprocessor, args.preprocessor_out)
+    print("Mô hình và bộ xử lý đã được lưu thành công!")
+
+    timer.report(rows)
+
+    if not args.headless:
+        plot_results(losses, y_test, y_pred)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Huấn luyện mô hình logistic regression trên dữ liệu lớn hơn RAM, đọc theo từng khối.
+
+    python models/train_streaming.py --data data/history.csv --chunksize 200000
+    python models/train_streaming.py --data data/history/      # thư mục Parquet (đọc theo row group)
+
+Việc đọc khối, chia train/test và lượt fit scaler dùng chung với
+train_model.py --chunksize (read_chunks, iter_chunks, fit_preprocessor_chunked).
+Sau đó mỗi epoch đọc lại các khối và chạy mini-batch SGD có momentum trên từng
+khối. Chỉ một khối nằm trong bộ nhớ tại một thời điểm.
+
+Kết quả là cùng hai file mà ChurnPredictorBolt đang nạp:
+models/logistic_mbgd_model.pkl (theta) và models/preprocessor.pkl (ColumnTransformer).
+"""
+import argparse
+
+import numpy as np
+from sklearn.metrics import accuracy_score, classification_report
+import joblib
+
+from train_model import (DATA_PATH, MODEL_PATH, PREPROCESSOR_PATH, Timer, add_intercept, features,
+                         fit_preprocessor_chunked, iter_chunks, loss_function, sigmoid_function)
+
+
+def train_sgd(path, preprocessor, chunksize, lr=0.05, epochs=20, batch_size=256, momentum=0.9,
+              lambda_reg=0.01, tol=1e-6, seed=42):
+    """Mini-batch SGD có momentum, mỗi epoch là một lượt đọc qua các khối"""
+    rng = np.random.default_rng(seed)
+    theta = np.zeros(len(features) + 1)
+    velocity = np.zeros_like(theta)
+    losses = []
+
+    for epoch in range(epochs):
+        loss_sum, n = 0.0, 0
+        for X_train, y_train, _, _ in iter_chunks(path, chunksize):
+            if len(X_train) == 0:
+                continue
+            X = add_intercept(preprocessor.transform(X_train))
+            order = rng.permutation(len(X))
+            for i in range(0, len(X), batch_size):
+                batch = order[i:i + batch_size]
+                X_batch, y_batch = X[batch], y_train[batch]
+                y_hat = sigmoid_function(X_batch @ theta)
+                gradient = X_batch.T @ (y_hat - y_batch) / len(batch) + lambda_reg * theta
+                velocity = momentum * velocity - lr * gradient
+                theta += velocity
+            # Loss của khối sau khi cập nhật, có trọng số theo số dòng
+            loss_sum += loss_function(sigmoid_function(X @ theta), y_train, theta, lambda_reg) * len(X)
+            n += len(X)
+
+        losses.append(loss_sum / n)
+        print(f"Epoch {epoch + 1}: loss {losses[-1]:.6f}")
+        if len(losses) > 1 and abs(losses[-2] - losses[-1]) < tol:
+            break
+    return theta, losses
+
+
+def evaluate(path, preprocessor, theta, chunksize):
+    y_test, y_pred = [], []
+    for _, _, X_test, y_chunk in iter_chunks(path, chunksize):
+        if len(X_test) == 0:
+            continue
+        X = add_intercept(preprocessor.transform(X_test))
+        y_pred.append(np.round(sigmoid_function(X @ theta)))
+        y_test.append(y_chunk)
+    return np.concatenate(y_test), np.concatenate(y_pred)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the churn model out of core with streaming SGD")
+    parser.add_argument("--data", default=DATA_PATH, help="CSV file, Parquet file or directory of Parquet parts")
+    parser.add_argument("--chunksize", type=int, default=100000, help="Rows per chunk / Parquet batch")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--lr", type=float, default=0.05)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--lambda-reg", type=float, default=0.01)
+    parser.add_argument("--tol", type=float, default=1e-6, help="Stop when the epoch loss changes less than this")
+    parser.add_argument("--model-out", default=MODEL_PATH)
+    parser.add_argument("--preprocessor-out", default=PREPROCESSOR_PATH)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    timer = Timer()
+
+    with timer.phase("scaler pass"):
+        preprocessor, rows = fit_preprocessor_chunked(args.data, args.chunksize)
+    with timer.phase("train"):
+        theta, losses = train_sgd(args.data, preprocessor, args.chunksize, lr=args.lr, epochs=args.epochs,
+                                  batch_size=args.batch_size, lambda_reg=args.lambda_reg, tol=args.tol)
+    with timer.phase("evaluate"):
+        y_test, y_pred = evaluate(args.data, preprocessor, theta, args.chunksize)
+
+    print(f'Accuracy: {accuracy_score(y_test, y_pred):.4f}')
+    print(classification_report(y_test, y_pred))
+
+    # Lưu mô hình và scaler
+    with timer.phase("save"):
+        joblib.dump(theta, args.model_out)
+        joblib.dump(preprocessor, args.preprocessor_out)
+    print("Mô hình và bộ xử lý đã được lưu thành công!")
+
+    timer.report(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,38 +1,57 @@
 import os
-import csv
 from streamparse.bolt import Bolt
+from common.sink import open_sink
+from common.stats_store import StatsStore
 
 class ChurnDataBolt(Bolt):
+    # Tuple được sink ack sau khi dòng của nó đã được ghi xuống file
+    auto_ack = False
+
     def initialize(self, conf, context):
         base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
         self.output_file = os.path.join(base_path, "data/processed_churn.csv")
 
-        try:
-            self.file = open(self.output_file, mode="a", newline="")
-            self.writer = csv.writer(self.file)
+        # Bộ đếm dùng chung với web app (/api/stats)
+        self.stats = StatsStore(conf.get("churn.stats.path", os.path.join(base_path, "data/pipeline_stats.db")))
 
-            if os.stat(self.output_file).st_size == 0:
-                self.writer.writerow(["TotalCharges", "MonthlyCharges", "Churn"])
+        try:
+            self.sink = open_sink(
+                conf, self.output_file, header=["TotalCharges", "MonthlyCharges", "Churn"],
+                ack=self.ack, fail=self.fail
+            )
 
         except IOError as e:
             self.log(f"Lỗi mở file: {e}")
 
     def process(self, tup):
         try:
-            key, value = tup
+            key, value = tup.values
             total_charges, monthly_charges = key
             churn = value
+        except (TypeError, ValueError) as e:
+            self.log(f"Lỗi dữ liệu đầu vào: {e}")
+            self.ack(tup)
+            return
 
-            # Ghi vào file CSV
-            self.writer.writerow([total_charges, monthly_charges, churn])
-            self.file.flush() 
+        try:
+            # Ghi vào file CSV (ghi theo nhóm, không flush từng dòng); tuple được ack khi nhóm được ghi
+            self.sink.writerow([total_charges, monthly_charges, churn], tup)
+            self.stats.add("processed")
+            self.stats.tick()
 
             self.log(f" Ghi dữ liệu: {total_charges}, {monthly_charges}, {churn}")
 
-        except Exception as e:
+        except OSError as e:
+            # Sink đã fail các tuple trong buffer, spout sẽ phát lại
             self.log(f"Lỗi trong quá trình ghi dữ liệu: {e}")
 
+    def process_tick(self, tup):
+        self.sink.tick()
+        self.stats.tick()
+
     def cleanup(self):
-        if hasattr(self, 'file') and self.file:
-            self.file.close()
+        if hasattr(self, 'sink') and self.sink:
+            self.sink.close()
             self.log("Đã đóng tệp CSV.")
+        if hasattr(self, 'stats') and self.stats:
+            self.stats.close()
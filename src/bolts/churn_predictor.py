@@ -1,58 +1,119 @@
 import os
-import csv
-import joblib
+import time
 import numpy as np
-import pandas as pd
 from streamparse.bolt import Bolt
+from common.model_registry import ModelRegistry
+from common.prediction_cache import PredictionCache
+from common.sink import open_sink
+from common.stats_store import StatsStore
 
 class ChurnPredictorBolt(Bolt):
+    outputs = ['TotalCharges', 'MonthlyCharges', 'Predicted_Churn', 'model_version']
+
+    # Tuple được sink ack sau khi dòng dự đoán của nó đã được ghi xuống file
+    auto_ack = False
+
     def initialize(self, conf, context):
         base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
-        
+
         model_path = os.path.join(base_path, "models/logistic_mbgd_model.pkl")
         preprocessor_path = os.path.join(base_path, "models/preprocessor.pkl")
 
-        self.model = joblib.load(model_path)
-        self.preprocessor = joblib.load(preprocessor_path)
+        # Scaler và theta được gộp thành một kernel NumPy, không cần DataFrame.
+        # Registry nạp lại model mới ở background; đổi model chỉ xảy ra giữa hai batch
+        self.registry = ModelRegistry.from_conf(conf, model_path, preprocessor_path, log=self.log)
+
+        # Cache xác suất theo cặp (TotalCharges, MonthlyCharges), bật bằng churn.cache.enabled
+        self.cache = PredictionCache.from_conf(conf, [model_path, preprocessor_path])
+
+        # Micro-batch: batch_size = 1 giữ nguyên hành vi dự đoán từng tuple
+        self.batch_size = max(1, int(conf.get("churn.predictor.batch_size", 1)))
+        self.batch_linger = float(conf.get("churn.predictor.batch_linger_secs", 1.0))
+        self.pending = []
+        self.batch_started = None
 
         self.csv_file = os.path.join(base_path, "data/predicted_churn.csv")
 
-        try:
-            self.file = open(self.csv_file, mode="a", newline="")
-            self.writer = csv.writer(self.file)
+        # Bộ đếm dùng chung với web app (/api/stats)
+        self.stats = StatsStore(conf.get("churn.stats.path", os.path.join(base_path, "data/pipeline_stats.db")))
 
-            if os.stat(self.csv_file).st_size == 0:
-                self.writer.writerow(["TotalCharges", "MonthlyCharges", "Predicted_Churn"])
+        try:
+            self.sink = open_sink(conf, self.csv_file, header=self.outputs, ack=self.ack, fail=self.fail)
 
         except IOError as e:
             self.log(f"Lỗi mở file: {e}")
 
     def process(self, tup):
         try:
-            TotalCharges, MonthlyCharges = tup
+            key, _ = tup.values
+            TotalCharges, MonthlyCharges = float(key[0]), float(key[1])
+        except (TypeError, ValueError) as e:
+            self.log(f"Lỗi dữ liệu đầu vào: {e}")
+            self.ack(tup)
+            return
 
-            data = pd.DataFrame([{
-                'TotalCharges': TotalCharges,
-                'MonthlyCharges': MonthlyCharges
-            }])
+        if not self.pending:
+            self.batch_started = time.time()
+        self.pending.append((tup, TotalCharges, MonthlyCharges))
 
-            # Chuẩn hóa dữ liệu 
-            X_processed = self.preprocessor.transform(data).flatten()  # Chuyển dữ liệu thành 1D
-            X_processed = np.hstack(([1.0], X_processed))  # Thêm bias (hệ số chặn)
+        if (len(self.pending) >= self.batch_size or
+                time.time() - self.batch_started >= self.batch_linger):
+            self._flush_batch()
 
-            # Dự đoán Churn với mô hình logistic regression
-            y_pred_prob = 1 / (1 + np.exp(-np.dot(X_processed, self.model)))  # Công thức sigmoid
-            prediction = int(y_pred_prob >= 0.5)  # Ngưỡng 0.5 để xác định dự đoán
+    def process_tick(self, tup):
+        # Tick tuple đảm bảo batch chưa đầy không bị giữ quá batch_linger giây
+        if self.pending and time.time() - self.batch_started >= self.batch_linger:
+            self._flush_batch()
+        self.sink.tick()
+        self.stats.tick()
+
+    def _flush_batch(self):
+        """Dự đoán toàn bộ batch đang chờ bằng một phép nhân ma trận"""
+        batch, self.pending = self.pending, []
+        model = self.registry.current
 
-            # Lưu kết quả vào CSV
-            self.writer.writerow([TotalCharges, MonthlyCharges, prediction])
-            self.file.flush()  
+        try:
+            X = np.array([(tc, mc) for _, tc, mc in batch], dtype=np.float64)
 
-            self.emit([TotalCharges, MonthlyCharges, prediction])
+            # Dự đoán Churn với mô hình logistic regression
+            if self.cache:
+                y_pred_prob, hits = self.cache.score(X, model.kernel.predict_proba, model.version)
+            else:
+                y_pred_prob, hits = model.kernel.predict_proba(X), None
+            predictions = (y_pred_prob >= 0.5).astype(int)  # Ngưỡng 0.5 để xác định dự đoán
 
         except Exception as e:
             self.log(f"Lỗi dự đoán: {e}")
+            for tup, _, _ in batch:
+                self.fail(tup)
+            return
+
+        for i, ((tup, TotalCharges, MonthlyCharges), prediction) in enumerate(zip(batch, predictions)):
+            prediction = int(prediction)
+            self.emit([TotalCharges, MonthlyCharges, prediction, model.version], anchors=[tup])
+            try:
+                # Lưu kết quả vào CSV; sink ack tuple khi dòng đã được ghi xuống file
+                self.sink.writerow([TotalCharges, MonthlyCharges, prediction, model.version], tup)
+            except OSError as e:
+                # Sink đã fail các tuple trong buffer; phần còn lại của batch được fail ở đây
+                self.log(f"Lỗi ghi kết quả: {e}")
+                for pending, _, _ in batch[i + 1:]:
+                    self.fail(pending)
+                return
+
+        self.stats.add("predicted", len(batch))
+        self.stats.add("predicted_churn", int(predictions.sum()))
+        if hits is not None:
+            self.stats.add("cache_hits", hits)
+            self.stats.add("cache_misses", len(batch) - hits)
+        self.stats.tick()
 
     def cleanup(self):
-        if hasattr(self, 'file') and self.file:
-            self.file.close()  
+        if self.pending:
+            self._flush_batch()
+        if hasattr(self, 'registry') and self.registry:
+            self.registry.stop()
+        if hasattr(self, 'sink') and self.sink:
+            self.sink.close()
+        if hasattr(self, 'stats') and self.stats:
+            self.stats.close()
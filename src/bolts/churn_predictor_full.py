@@ -0,0 +1,116 @@
+import os
+import time
+from streamparse.bolt import Bolt
+from common.inference import load_encoded_kernel
+from common.model_registry import ModelRegistry
+from common.records import TELCO_COLUMNS
+from common.sink import open_sink
+from common.stats_store import StatsStore
+
+# Bố cục của `value` trên stream 'customer': mọi cột trừ customerID
+VALUE_COLUMNS = TELCO_COLUMNS[1:]
+CONTRACT, INTERNET_SERVICE, PAYMENT_METHOD = (VALUE_COLUMNS.index(column) for column in
+                                              ("Contract", "InternetService", "PaymentMethod"))
+
+
+class ChurnPredictorFullBolt(Bolt):
+    """Dự đoán churn từ toàn bộ thuộc tính khách hàng (stream 'customer')"""
+    outputs = ['customerID', 'Contract', 'InternetService', 'PaymentMethod', 'prediction', 'probability',
+               'model_version']
+
+    # Tuple được sink ack sau khi dòng dự đoán của nó đã được ghi xuống file
+    auto_ack = False
+
+    def initialize(self, conf, context):
+        base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+        # Kernel đã biên dịch (bảng tra category -> trọng số) lưu dạng JSON, không cần scikit-learn
+        kernel_path = os.path.join(base_path, "models/logistic_full_kernel.json")
+        self.registry = ModelRegistry.from_conf(conf, kernel_path, None, log=self.log, loader=load_encoded_kernel)
+
+        self.batch_size = max(1, int(conf.get("churn.predictor.batch_size", 1)))
+        self.batch_linger = float(conf.get("churn.predictor.batch_linger_secs", 1.0))
+        self.pending = []
+        self.batch_started = None
+
+        self.csv_file = os.path.join(base_path, "data/predicted_churn_full.csv")
+
+        # Bộ đếm dùng chung với web app (/api/stats)
+        self.stats = StatsStore(conf.get("churn.stats.path", os.path.join(base_path, "data/pipeline_stats.db")))
+
+        try:
+            self.sink = open_sink(
+                conf, self.csv_file,
+                header=["customerID", "Contract", "InternetService", "PaymentMethod", "Predicted_Churn",
+                        "Probability", "model_version"],
+                ack=self.ack, fail=self.fail
+            )
+
+        except IOError as e:
+            self.log(f"Lỗi mở file: {e}")
+
+    def process(self, tup):
+        customerID, value = tup.values
+        if len(value) != len(VALUE_COLUMNS):
+            self.log(f"Lỗi dữ liệu đầu vào: {customerID} có {len(value)} trường")
+            self.ack(tup)
+            return
+
+        if not self.pending:
+            self.batch_started = time.time()
+        self.pending.append((tup, customerID, value))
+
+        if (len(self.pending) >= self.batch_size or
+                time.time() - self.batch_started >= self.batch_linger):
+            self._flush_batch()
+
+    def process_tick(self, tup):
+        # Tick tuple đảm bảo batch chưa đầy không bị giữ quá batch_linger giây
+        if self.pending and time.time() - self.batch_started >= self.batch_linger:
+            self._flush_batch()
+        self.sink.tick()
+        self.stats.tick()
+
+    def _flush_batch(self):
+        """Dự đoán toàn bộ batch: tra bảng category rồi một phép gather-sum"""
+        batch, self.pending = self.pending, []
+        model = self.registry.current
+
+        try:
+            probabilities = model.kernel.predict_proba([value for _, _, value in batch], VALUE_COLUMNS)
+            predictions = (probabilities >= 0.5).astype(int)
+
+        except Exception as e:
+            self.log(f"Lỗi dự đoán: {e}")
+            for tup, _, _ in batch:
+                self.fail(tup)
+            return
+
+        for i, ((tup, customerID, value), prediction, probability) in enumerate(
+                zip(batch, predictions, probabilities)):
+            row = [customerID, value[CONTRACT], value[INTERNET_SERVICE], value[PAYMENT_METHOD],
+                   int(prediction), float(probability), model.version]
+            self.emit(row, anchors=[tup])
+            try:
+                # Sink ack tuple khi dòng đã được ghi xuống file
+                self.sink.writerow(row, tup)
+            except OSError as e:
+                # Sink đã fail các tuple trong buffer; phần còn lại của batch được fail ở đây
+                self.log(f"Lỗi ghi kết quả: {e}")
+                for pending, _, _ in batch[i + 1:]:
+                    self.fail(pending)
+                return
+
+        self.stats.add("predicted_full", len(batch))
+        self.stats.add("predicted_full_churn", int(predictions.sum()))
+        self.stats.tick()
+
+    def cleanup(self):
+        if self.pending:
+            self._flush_batch()
+        if hasattr(self, 'registry') and self.registry:
+            self.registry.stop()
+        if hasattr(self, 'sink') and self.sink:
+            self.sink.close()
+        if hasattr(self, 'stats') and self.stats:
+            self.stats.close()
@@ -1,57 +1,91 @@
 import os
-import csv
-import joblib
-import numpy as np
-import pandas as pd
 from streamparse.bolt import Bolt
+from common.model_registry import ModelRegistry
+from common.prediction_cache import PredictionCache
+from common.sink import open_sink
+from common.stats_store import StatsStore
 
 class ChurnPredictorNewBolt(Bolt):
+    # Tuple được sink ack sau khi dòng dự đoán của nó đã được ghi xuống file
+    auto_ack = False
+
     def initialize(self, conf, context):
         base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
         
         model_path = os.path.join(base_path, "models/logistic_model_new.pkl")
         preprocessor_path = os.path.join(base_path, "models/preprocessor_new.pkl")
 
-        self.model = joblib.load(model_path)
-        self.preprocessor = joblib.load(preprocessor_path)
+        # Scaler và hệ số logistic được gộp thành một kernel NumPy; registry nạp lại model mới ở background
+        self.registry = ModelRegistry.from_conf(conf, model_path, preprocessor_path, log=self.log)
+
+        # Cache xác suất theo cặp (TotalCharges, MonthlyCharges), bật bằng churn.cache.enabled
+        self.cache = PredictionCache.from_conf(conf, [model_path, preprocessor_path])
 
         self.csv_file = os.path.join(base_path, "data/predicted_churn_new.csv")
 
-        try:
-            self.file = open(self.csv_file, mode="a", newline="")
-            self.writer = csv.writer(self.file)
+        # Bộ đếm dùng chung với web app (/api/stats)
+        self.stats = StatsStore(conf.get("churn.stats.path", os.path.join(base_path, "data/pipeline_stats.db")))
 
-            if os.stat(self.csv_file).st_size == 0:
-                self.writer.writerow(["TotalCharges", "MonthlyCharges", "Predicted_Churn", "Probability"])
+        try:
+            self.sink = open_sink(
+                conf, self.csv_file,
+                header=["TotalCharges", "MonthlyCharges", "Predicted_Churn", "Probability", "model_version"],
+                ack=self.ack, fail=self.fail
+            )
 
         except IOError as e:
             self.log(f"Lỗi mở file: {e}")
 
     def process(self, tup):
         try:
-            TotalCharges, MonthlyCharges = tup
+            key, _ = tup.values
+            TotalCharges, MonthlyCharges = float(key[0]), float(key[1])
+        except (TypeError, ValueError) as e:
+            self.log(f"Lỗi dữ liệu đầu vào: {e}")
+            self.ack(tup)
+            return
 
-            data = pd.DataFrame([{
-                'TotalCharges': TotalCharges,
-                'MonthlyCharges': MonthlyCharges
-            }])
+        try:
+            # Dự đoán Churn với mô hình logistic regression
+            model = self.registry.current
+            X = [[TotalCharges, MonthlyCharges]]
+            if self.cache:
+                probabilities, hits = self.cache.score(X, model.kernel.predict_proba, model.version)
+                self.stats.add("cache_hits", hits)
+                self.stats.add("cache_misses", 1 - hits)
+            else:
+                probabilities = model.kernel.predict_proba(X)
+            probability = float(probabilities[0])  # Prob of Yes
+            prediction = int(probability >= 0.5)
 
-            # Chuẩn hóa dữ liệu 
-            X_processed = self.preprocessor.transform(data)
+        except Exception as e:
+            self.log(f"Lỗi dự đoán: {e}")
+            self.fail(tup)
+            return
 
-            # Dự đoán Churn với mô hình logistic regression
-            prediction = int(self.model.predict(X_processed)[0])
-            probability = self.model.predict_proba(X_processed)[0][1]  # Prob of Yes
+        try:
+            self.emit([TotalCharges, MonthlyCharges, prediction, probability, model.version], anchors=[tup])
 
-            # Lưu kết quả vào CSV
-            self.writer.writerow([TotalCharges, MonthlyCharges, prediction, probability])
-            self.file.flush()  
+            # Lưu kết quả vào CSV; sink ack tuple khi dòng đã được ghi xuống file
+            self.sink.writerow([TotalCharges, MonthlyCharges, prediction, probability, model.version], tup)
 
-            self.emit([TotalCharges, MonthlyCharges, prediction, probability])
+        except OSError as e:
+            # Sink đã fail các tuple trong buffer, spout sẽ phát lại
+            self.log(f"Lỗi ghi kết quả: {e}")
+            return
 
-        except Exception as e:
-            self.log(f"Lỗi dự đoán: {e}")
+        self.stats.add("predicted")
+        self.stats.add("predicted_churn", prediction)
+        self.stats.tick()
+
+    def process_tick(self, tup):
+        self.sink.tick()
+        self.stats.tick()
 
     def cleanup(self):
-        if hasattr(self, 'file') and self.file:
-            self.file.close() 
\ No newline at end of file
+        if hasattr(self, 'registry') and self.registry:
+            self.registry.stop()
+        if hasattr(self, 'sink') and self.sink:
+            self.sink.close()
+        if hasattr(self, 'stats') and self.stats:
+            self.stats.close()
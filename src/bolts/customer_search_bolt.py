@@ -1,43 +1,49 @@
 import os
-import csv
 from streamparse.bolt import Bolt
+from common.sink import BufferedCsvSink
 
 class CustomerSearchBolt(Bolt):
+    # Tuple được sink ack sau khi dòng của nó đã được ghi xuống file
+    auto_ack = False
+
     def initialize(self, conf, context):
-        self.base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../"))
+        self.base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
         self.output_yes_file = os.path.join(self.base_path, "data/data_for_searching_yes.csv")
         self.output_no_file = os.path.join(self.base_path, "data/data_for_searching_no.csv")
 
-        self.file_yes = open(self.output_yes_file, mode="a", newline="")
-        self.file_no = open(self.output_no_file, mode="a", newline="")
-
-        self.writer_yes = csv.writer(self.file_yes)
-        self.writer_no = csv.writer(self.file_no)
-
-        if os.stat(self.output_yes_file).st_size == 0:
-            self.writer_yes.writerow(["customerID", "value"])
-
-        if os.stat(self.output_no_file).st_size == 0:
-            self.writer_no.writerow(["customerID", "value"])
+        self.sink_yes = BufferedCsvSink.from_conf(conf, self.output_yes_file, header=["customerID", "value"],
+                                                  ack=self.ack, fail=self.fail)
+        self.sink_no = BufferedCsvSink.from_conf(conf, self.output_no_file, header=["customerID", "value"],
+                                                 ack=self.ack, fail=self.fail)
 
     def process(self, tup):
         try:
-            customerID, value = tup
+            customerID, value = tup.values
             churn = value[-1]  # Lấy giá trị của trường 'Churn'
+        except (TypeError, ValueError, IndexError) as e:
+            self.log(f"Error processing tuple: {e}")
+            self.ack(tup)
+            return
 
-            # Phân vùng theo giá trị Churn
+        try:
+            # Phân vùng theo giá trị Churn; sink ack tuple khi dòng đã được ghi xuống file
             if churn == 'Yes':
-                self.writer_yes.writerow([customerID, value])  # Lưu vào file data_for_searching_yes.csv
-                self.file_yes.flush()
+                self.sink_yes.writerow([customerID, value], tup)  # Lưu vào file data_for_searching_yes.csv
             elif churn == 'No':
-                self.writer_no.writerow([customerID, value])  # Lưu vào file data_for_searching_no.csv
-                self.file_no.flush()
+                self.sink_no.writerow([customerID, value], tup)  # Lưu vào file data_for_searching_no.csv
+            else:
+                self.ack(tup)
 
-        except Exception as e:
-            self.log(f"Error processing tuple: {e}")
+        except OSError as e:
+            # Sink đã fail các tuple trong buffer, spout sẽ phát lại
+            self.log(f"Error writing tuple: {e}")
+
+    def process_tick(self, tup):
+        self.sink_yes.tick()
+        self.sink_no.tick()
 
     def cleanup(self):
-        if hasattr(self, 'file_yes') and self.file_yes:
-            self.file_yes.close()
-        if hasattr(self, 'file_no') and self.file_no:
-            self.file_no.close()
+        if hasattr(self, 'sink_yes') and self.sink_yes:
+            self.sink_yes.close()
+        if hasattr(self, 'sink_no') and self.sink_no:
+            self.sink_no.close()
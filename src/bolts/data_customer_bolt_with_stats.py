@@ -1,97 +1,79 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
-import csv
+import time
 from streamparse.bolt import Bolt
+from common.customer_stats import CustomerStats, read_snapshot, write_snapshot
 
 class DataCustomerBoltWithStats(Bolt):
+    # Tuple chỉ được ack sau khi snapshot chứa nó đã được ghi: crash không làm mất dòng nào khỏi thống kê
+    auto_ack = False
+
     def initialize(self, conf, context):
         base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
-        self.output_file = os.path.join(base_path, "data/processed_customer_data.csv")
-
-        self.file = open(self.output_file, mode="a", encoding="utf-8", newline="")
-        self.writer = csv.writer(self.file)
-
-        if os.stat(self.output_file).st_size == 0:
-            self.writer.writerow(["customerID", "value"])
-
-        self.data = []
-        self.churned_customers = []
+        self.stats_file = os.path.join(base_path, "data/statistics_summary.csv")
+        self.snapshot_file = os.path.join(base_path, "data/statistics_snapshot.json")
+
+        # Dòng đã xử lý do DataCustomerBolt ghi (data/processed_customer_data.csv); bolt này chỉ giữ thống kê.
+        # Bộ tích lũy trực tuyến: bộ nhớ không phụ thuộc độ dài stream
+        self.snapshot_secs = float(conf.get("churn.stats.snapshot_secs", 5.0))
+        # Snapshot sớm khi có nhiều tuple chờ ack, để spout không bị chặn bởi max_pending
+        self.snapshot_tuples = int(conf.get("churn.stats.snapshot_tuples", 500))
+        self.unacked = []
+        self.stats = self._restore(conf)
+        self.run_id = int(time.time())
+        self.snapshot_rows = self.stats.rows
+        self.snapshot_at = time.time()
+
+    def _restore(self, conf):
+        """Tiếp tục từ snapshot trước (nếu có) để crash không làm mất thống kê"""
+        if os.path.exists(self.snapshot_file):
+            try:
+                stats = CustomerStats.from_state(read_snapshot(self.snapshot_file)["state"])
+                self.log(f"Khôi phục thống kê từ {self.snapshot_file}: {stats.rows} dòng")
+                return stats
+            except Exception as e:
+                self.log(f"Bỏ qua snapshot không đọc được {self.snapshot_file}: {e}")
+
+        return CustomerStats(
+            sketch_k=conf.get("churn.stats.sketch_k", 200),
+            histogram_range=(conf.get("churn.stats.histogram_min", 0.0), conf.get("churn.stats.histogram_max", 9000.0)),
+            histogram_bins=conf.get("churn.stats.histogram_bins", 30),
+        )
 
     def process(self, tup):
         try:
-            customerID, value = tup
-            self.writer.writerow([customerID, ','.join(value)])
-            self.file.flush()  
-
-            self.data.append(value)
-
-            churn_status = value[-1]  
-            if churn_status == 'Yes':  
-                self.churned_customers.append(customerID)
-
-        except Exception as e:
-            self.log(f"Lỗi trong quá trình ghi dữ liệu: {e}")
+            _, value = tup.values
+            self.stats.update(value)
+        except (TypeError, ValueError) as e:
+            self.log(f"Lỗi cập nhật thống kê: {e}")
+            self.ack(tup)
+            return
+
+        self.unacked.append(tup)
+        if len(self.unacked) >= self.snapshot_tuples:
+            self._snapshot()
+
+    def process_tick(self, tup):
+        if time.time() - self.snapshot_at >= self.snapshot_secs:
+            self._snapshot()
+
+    def _snapshot(self):
+        self.snapshot_at = time.time()
+        if self.stats.rows != self.snapshot_rows:
+            try:
+                write_snapshot(self.stats, self.stats_file, self.snapshot_file,
+                               version=f"{self.run_id}-{self.stats.rows}")
+                self.snapshot_rows = self.stats.rows
+            except Exception as e:
+                # Giữ tuple chưa ack, thử lại ở tick sau
+                self.log(f"Lỗi ghi thống kê: {e}")
+                return
+
+        unacked, self.unacked = self.unacked, []
+        for tup in unacked:
+            self.ack(tup)
 
     def cleanup(self):
-        if hasattr(self, 'file') and self.file:
-            self.file.close()
-
-        # Chuyển dữ liệu sang dataframe
-        df = pd.DataFrame(self.data, columns=["Feature_" + str(i) for i in range(1, len(self.data[0]) + 1)])
-
-        # Cập nhật lại tên cột cho dễ dàng truy cập
-        df.columns = ["customerID", "gender", "SeniorCitizen", "Partner", "Dependents", "tenure", 
-                      "PhoneService", "MultipleLines", "InternetService", "OnlineSecurity", "OnlineBackup", 
-                      "DeviceProtection", "TechSupport", "StreamingTV", "StreamingMovies", "Contract", 
-                      "PaperlessBilling", "PaymentMethod", "MonthlyCharges", "TotalCharges", "Churn"]
-
-        # Chuyển TotalCharges và MonthlyCharges thành kiểu số
-        df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors='coerce')
-        df["MonthlyCharges"] = pd.to_numeric(df["MonthlyCharges"], errors='coerce')
-
-        # Tính toán thống kê cơ bản
-        stats = df.describe()
-
-        # Lưu thống kê vào file CSV
-        stats_file = os.path.join(os.path.dirname(self.output_file), "statistics_summary.csv")
-        stats.to_csv(stats_file)
-        self.log(f"Đã lưu thống kê vào file: {stats_file}")
-
-        # Biểu đồ pie cho khách hàng rời đi
-        churned_count = len(self.churned_customers)
-        not_churned_count = len(self.data) - churned_count
-
-        labels = ['Khách hàng rời đi', 'Khách hàng không rời đi']
-        sizes = [churned_count, not_churned_count]
-        explode = (0.1, 0)
-
-        plt.figure(figsize=(7, 7))
-        plt.pie(sizes, explode=explode, labels=labels, autopct='%1.1f%%', shadow=True, startangle=140)
-        plt.title("Tỷ lệ khách hàng rời đi vs không rời đi")
-        plt.axis('equal')
-        plt.savefig(os.path.join(os.path.dirname(self.output_file), "churned_customers_piechart.png"))
-        plt.close()
-
-        # Tính giá trị trung bình của TotalCharges và MonthlyCharges theo Churn
-        churn_grouped = df.groupby('Churn')[['TotalCharges', 'MonthlyCharges']].mean()
-
-        # Vẽ biểu đồ cho trung bình TotalCharges và MonthlyCharges theo Churn
-        churn_grouped.plot(kind='bar', figsize=(10, 6), color=["orange", "yellow"])
-        plt.title("Trung bình TotalCharges và MonthlyCharges theo Churn")
-        plt.ylabel("Giá trị trung bình ($)")
-        plt.xlabel("Churn (0: Không, 1: Có)")
-        plt.legend(["TotalCharges", "MonthlyCharges"])
-        plt.savefig(os.path.join(os.path.dirname(self.output_file), "average_charges_by_churn.png"))
-        plt.close()
-
-        # Vẽ biểu đồ phân phối khách hàng theo TotalCharges (có phân loại Churn)
-        plt.figure(figsize=(12, 7))
-        sns.histplot(df, x='TotalCharges', hue='Churn', multiple="stack", kde=True, bins=30, palette="Set2")
-        plt.title("Phân phối khách hàng theo TotalCharges (có phân loại Churn)")
-        plt.xlabel("TotalCharges ($)")
-        plt.ylabel("Số lượng khách hàng")
-        plt.legend(title="Churn", labels=["Không rời đi", "Rời đi"])
-        plt.savefig(os.path.join(os.path.dirname(self.output_file), "customer_distribution_by_totalcharges.png"))
-        plt.close()
+        # Snapshot cuối cùng; biểu đồ được vẽ bởi webapp/chart_renderer.py trong process riêng
+        if hasattr(self, 'stats') and (self.stats.rows or self.unacked):
+            self._snapshot()
+            self.log(f"Đã lưu thống kê vào file: {self.stats_file}")
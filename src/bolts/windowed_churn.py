@@ -0,0 +1,82 @@
+import time
+from streamparse.bolt import Bolt
+from bolts.churn_predictor_full import ChurnPredictorFullBolt
+from common.windows import SlidingWindow, TumblingWindow, parse_size
+
+# Bố cục tuple đầu vào: output của ChurnPredictorFullBolt
+INPUT_FIELDS = ChurnPredictorFullBolt.outputs
+PREDICTION = INPUT_FIELDS.index('prediction')
+PROBABILITY = INPUT_FIELDS.index('probability')
+
+SEGMENTS = ['Contract', 'InternetService', 'PaymentMethod']
+
+
+class WindowedChurnBolt(Bolt):
+    """Tỷ lệ churn dự đoán, xác suất trung bình và số lượng theo cửa sổ thời gian cho từng segment.
+
+    Mỗi cửa sổ (mặc định 1m/5m/1h) có hai dạng: sliding (ring buffer gồm
+    churn.window.buckets bucket, emit mỗi churn.window.emit_secs giây) và
+    tumbling (emit một lần khi cửa sổ đóng). Mỗi segment là một cặp (cột, giá
+    trị), cộng thêm segment ('all', 'all') cho toàn bộ stream.
+    """
+    outputs = ['window', 'kind', 'dimension', 'segment', 'window_end', 'count', 'churn_rate', 'mean_probability']
+
+    def initialize(self, conf, context):
+        sizes = conf.get("churn.window.sizes", ["1m", "5m", "1h"])
+        self.windows = [(size, parse_size(size)) for size in sizes]
+        self.buckets = int(conf.get("churn.window.buckets", 60))
+        self.emit_secs = float(conf.get("churn.window.emit_secs", 5.0))
+        segments = conf.get("churn.window.segments", SEGMENTS)
+        self.dimensions = [(dimension, INPUT_FIELDS.index(dimension)) for dimension in segments]
+
+        # (dimension, segment) -> [(tên cửa sổ, SlidingWindow, TumblingWindow)]
+        self.segments = {}
+        self.emitted_at = time.time()
+
+    def _windows(self, key):
+        windows = self.segments.get(key)
+        if windows is None:
+            windows = self.segments[key] = [(name, SlidingWindow(size, self.buckets), TumblingWindow(size))
+                                            for name, size in self.windows]
+        return windows
+
+    def process(self, tup):
+        try:
+            values = tup.values
+            churn, probability = int(values[PREDICTION]), float(values[PROBABILITY])
+        except (ValueError, TypeError, IndexError) as e:
+            self.log(f"Lỗi dữ liệu đầu vào: {e}")
+            return
+
+        now = time.time()
+        keys = [('all', 'all')] + [(dimension, values[i]) for dimension, i in self.dimensions]
+        for key in keys:
+            for name, sliding, tumbling in self._windows(key):
+                sliding.add(now, churn, probability)
+                closed = tumbling.add(now, churn, probability)
+                if closed:
+                    self._emit(name, 'tumbling', key, *closed)
+
+    def process_tick(self, tup):
+        now = time.time()
+        # Cửa sổ tumbling đóng cả khi không có tuple mới
+        for key, windows in self.segments.items():
+            for name, _, tumbling in windows:
+                closed = tumbling.advance(now)
+                if closed:
+                    self._emit(name, 'tumbling', key, *closed)
+
+        if now - self.emitted_at < self.emit_secs:
+            return
+        self.emitted_at = now
+        for key, windows in self.segments.items():
+            for name, sliding, _ in windows:
+                self._emit(name, 'sliding', key, now, sliding.result(now))
+
+    def _emit(self, name, kind, key, window_end, totals):
+        count = totals['count']
+        if not count:
+            return
+        dimension, segment = key
+        self.emit([name, kind, dimension, segment, window_end, count,
+                   totals['churn'] / count, totals['probability'] / count])
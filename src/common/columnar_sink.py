@@ -0,0 +1,196 @@
+import fcntl
+import os
+import time
+
+from common.sink import PendingAcks, hold, in_use, release, rolled_path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed when churn.sink.format = parquet
+    pa = pq = None
+
+
+class ParquetSink:
+    """Rolling Parquet writer with the same interface as BufferedCsvSink.
+
+    Rows are buffered column-wise and written as one row group once
+    ``max_rows`` rows are buffered or ``max_secs`` has passed. A part file is
+    closed after ``rows_per_file`` rows or ``file_secs`` seconds and only then
+    renamed to ``part-<n>.parquet``, so readers never see a file without its
+    footer. The in-progress file starts with a dot, which pyarrow skips. The
+    part number is claimed with ``os.link`` (fails if the name exists), so
+    parallel tasks writing to one directory never overwrite each other.
+
+    Rows only become durable when their part file is published, so tuples
+    passed to ``writerow`` (with ``ack``/``fail`` callbacks) are acked at
+    publish time, and a sink tracking tuples publishes a part at every flush
+    to keep ack latency within ``max_secs``.
+    """
+
+    def __init__(self, directory, header, max_rows=10000, max_secs=5.0,
+                 rows_per_file=1000000, file_secs=300.0, compression="snappy", ack=None, fail=None):
+        if pa is None:
+            raise ImportError("pyarrow is required for the parquet output format")
+
+        self.directory = directory
+        self.header = list(header)
+        self.max_rows = max(1, int(max_rows))
+        self.max_secs = float(max_secs)
+        self.rows_per_file = max(1, int(rows_per_file))
+        self.file_secs = float(file_secs)
+        self.compression = compression
+        self.pending = PendingAcks(ack, fail)
+
+        os.makedirs(directory, exist_ok=True)
+        # Held for the sink's lifetime so another sink never moves this one's parts
+        self.lock_file = open(os.path.join(directory, ".writers"), mode="a+")
+        fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+        try:
+            self._roll_stale_parts()
+            self.held = hold(self.lock_file)
+        except BaseException:
+            self.lock_file.close()
+            raise
+        finally:
+            if not self.lock_file.closed:
+                fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+        self.part = 0
+        self.schema = None
+        self.writer = None
+        self.file_rows = 0
+        self.file_opened = None
+
+        self.columns = [[] for _ in self.header]
+        self.buffered_rows = 0
+        self.last_flush = time.time()
+
+    def _roll_stale_parts(self):
+        """Move part files written with another column layout to a sibling directory.
+
+        Readers load the whole directory as one dataset, so parts from before a
+        change to the bolt's output fields would be read under the wrong schema.
+        Raises ValueError instead if a live sink still writes the directory.
+        """
+        stale = []
+        for name in os.listdir(self.directory):
+            if name.startswith("part-") and name.endswith(".parquet"):
+                path = os.path.join(self.directory, name)
+                try:
+                    if pq.read_schema(path).names != self.header:
+                        stale.append(name)
+                except FileNotFoundError:
+                    pass  # already moved by a parallel task
+        if not stale:
+            return
+        if in_use(self.lock_file):
+            raise ValueError(f"{self.directory} is open in another sink with a different header")
+
+        rolled = rolled_path(self.directory)
+        os.makedirs(rolled, exist_ok=True)
+        for name in stale:
+            try:
+                os.rename(os.path.join(self.directory, name), os.path.join(rolled, name))
+            except FileNotFoundError:
+                pass
+
+    def _next_part_number(self):
+        parts = [name for name in os.listdir(self.directory)
+                 if name.startswith("part-") and name.endswith(".parquet")]
+        return max((int(name[5:-8]) for name in parts), default=-1) + 1
+
+    def _in_progress_path(self):
+        return os.path.join(self.directory, f".part-{os.getpid()}-{self.part}.parquet.inprogress")
+
+    def _publish(self, in_progress):
+        """Link the closed file under the next free part-<n>.parquet name"""
+        number = self._next_part_number()
+        while True:
+            final = os.path.join(self.directory, f"part-{number:05d}.parquet")
+            try:
+                os.link(in_progress, final)
+                break
+            except FileExistsError:
+                number += 1
+        os.unlink(in_progress)
+
+    def writerow(self, row, anchor=None):
+        for column, value in zip(self.columns, row):
+            column.append(value)
+        self.pending.add(anchor)
+        self.buffered_rows += 1
+        if self.buffered_rows >= self.max_rows or time.time() - self.last_flush >= self.max_secs:
+            self.flush()
+
+    def tick(self):
+        """Flush buffered rows and roll the part file when their time limits expire"""
+        now = time.time()
+        if self.buffered_rows and now - self.last_flush >= self.max_secs:
+            self.flush()
+        if self.writer is not None and now - self.file_opened >= self.file_secs:
+            self._roll()
+
+    def flush(self):
+        """Write buffered rows as one row group"""
+        if self.buffered_rows:
+            data = dict(zip(self.header, self.columns))
+            try:
+                if self.schema is None:
+                    table = pa.Table.from_pydict(data)
+                    self.schema = table.schema
+                else:
+                    table = pa.Table.from_pydict(data, schema=self.schema)
+
+                if self.writer is None:
+                    self.writer = pq.ParquetWriter(self._in_progress_path(), self.schema,
+                                                   compression=self.compression)
+                    self.file_opened = time.time()
+                self.writer.write_table(table)
+                self.file_rows += self.buffered_rows
+            except Exception:
+                self._discard()
+                raise
+            finally:
+                self.columns = [[] for _ in self.header]
+                self.buffered_rows = 0
+            if self.file_rows >= self.rows_per_file or self.pending:
+                self._roll()
+        self.last_flush = time.time()
+
+    def _roll(self):
+        """Close the current part file and publish it under its final name"""
+        if self.writer is None:
+            return
+        try:
+            self.writer.close()
+            self._publish(self._in_progress_path())
+        except Exception:
+            self._discard()
+            raise
+        self.writer = None
+        self.file_rows = 0
+        self.part += 1
+        self.pending.commit()
+
+    def _discard(self):
+        """Drop the unpublished part after a write error; its tuples are failed and replayed"""
+        self.pending.abort()
+        if self.writer is not None:
+            try:
+                self.writer.close()
+            except Exception:
+                pass
+            self.writer = None
+        try:
+            os.unlink(self._in_progress_path())
+        except FileNotFoundError:
+            pass
+        self.file_rows = 0
+        self.part += 1
+
+    def close(self):
+        self.flush()
+        self._roll()
+        if not self.lock_file.closed:
+            release(self.held)
+            self.lock_file.close()
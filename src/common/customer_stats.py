@@ -0,0 +1,188 @@
+import json
+import os
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from common.records import TELCO_COLUMNS
+from common.streaming_stats import FixedHistogram, KllSketch, RunningMoments
+
+# Bố cục của `value` trên stream 'customer': mọi cột trừ customerID
+VALUE_COLUMNS = TELCO_COLUMNS[1:]
+NUMERIC_COLUMNS = ["SeniorCitizen", "tenure", "MonthlyCharges", "TotalCharges"]
+CATEGORICAL_COLUMNS = [column for column in VALUE_COLUMNS if column not in NUMERIC_COLUMNS]
+GROUP_COLUMNS = ["TotalCharges", "MonthlyCharges"]
+HISTOGRAM_COLUMN = "TotalCharges"
+
+# Hàng của statistics_summary.csv, giống DataFrame.describe(include='all')
+SUMMARY_ROWS = ["count", "unique", "top", "freq", "mean", "std", "min", "25%", "50%", "75%", "max"]
+QUANTILES = [0.25, 0.5, 0.75]
+
+_NUMERIC = [VALUE_COLUMNS.index(column) for column in NUMERIC_COLUMNS]
+_CATEGORICAL = [VALUE_COLUMNS.index(column) for column in CATEGORICAL_COLUMNS]
+_GROUP = [NUMERIC_COLUMNS.index(column) for column in GROUP_COLUMNS]
+_HISTOGRAM = NUMERIC_COLUMNS.index(HISTOGRAM_COLUMN)
+_CHURN = VALUE_COLUMNS.index("Churn")
+
+
+def _to_float(value):
+    # TotalCharges để trống với khách hàng mới (tenure = 0), như common.records
+    value = str(value).strip()
+    return float(value) if value else 0.0
+
+
+class CustomerStats:
+    """Thống kê trực tuyến của stream 'customer' với bộ nhớ cố định.
+
+    Mỗi tuple cập nhật: mean/variance/min/max (Welford) và KLL sketch cho các
+    cột số, bảng tần suất cho các cột phân loại (tối đa ``max_categories`` giá
+    trị mỗi cột, phần còn lại gộp vào "other"), histogram cố định của
+    TotalCharges và trung bình TotalCharges/MonthlyCharges theo từng lớp Churn.
+    Phần số được gộp vào RunningMoments theo khối ``fold_rows`` dòng (cập nhật
+    numpy từng dòng một chậm hơn nhiều so với bản thân phép tính).
+    """
+    fold_rows = 256
+
+    def __init__(self, sketch_k=200, histogram_range=(0.0, 9000.0), histogram_bins=30, max_categories=1000):
+        self.sketch_k = int(sketch_k)
+        self.histogram_range = tuple(histogram_range)
+        self.histogram_bins = int(histogram_bins)
+        self.max_categories = int(max_categories)
+
+        self.rows = 0
+        self.moments = RunningMoments(len(NUMERIC_COLUMNS))
+        self.sketches = [KllSketch(self.sketch_k) for _ in NUMERIC_COLUMNS]
+        self.categories = {column: Counter() for column in CATEGORICAL_COLUMNS}
+        self.groups = {}
+        self.unfolded = []
+
+    def _group(self, churn):
+        group = self.groups.get(churn)
+        if group is None:
+            if len(self.groups) >= self.max_categories:
+                churn = "other"
+                group = self.groups.get(churn)
+            if group is None:
+                group = self.groups[churn] = {
+                    "moments": RunningMoments(len(GROUP_COLUMNS)),
+                    "histogram": FixedHistogram(*self.histogram_range, self.histogram_bins),
+                }
+        return group
+
+    def update(self, value):
+        """Cộng một hàng (danh sách theo VALUE_COLUMNS); ValueError nếu hàng sai định dạng"""
+        if len(value) != len(VALUE_COLUMNS):
+            raise ValueError(f"Expected {len(VALUE_COLUMNS)} fields, got {len(value)}")
+        numbers = [_to_float(value[i]) for i in _NUMERIC]
+
+        self.rows += 1
+        for sketch, number in zip(self.sketches, numbers):
+            sketch.update(number)
+
+        for column, i in zip(CATEGORICAL_COLUMNS, _CATEGORICAL):
+            counts = self.categories[column]
+            category = str(value[i]).strip()
+            if category not in counts and len(counts) >= self.max_categories:
+                category = "other"
+            counts[category] += 1
+
+        group = self._group(str(value[_CHURN]).strip())
+        group["histogram"].update(numbers[_HISTOGRAM])
+        self.unfolded.append((group, numbers))
+        if len(self.unfolded) >= self.fold_rows:
+            self.fold()
+
+    def fold(self):
+        """Gộp các dòng đang chờ vào mean/variance tổng và theo nhóm Churn"""
+        if not self.unfolded:
+            return
+        unfolded, self.unfolded = self.unfolded, []
+        X = np.array([numbers for _, numbers in unfolded], dtype=np.float64)
+        self.moments.update(X)
+
+        rows_by_group = {}
+        for n, (group, _) in enumerate(unfolded):
+            rows_by_group.setdefault(id(group), (group, []))[1].append(n)
+        for group, rows in rows_by_group.values():
+            group["moments"].update(X[np.ix_(rows, _GROUP)])
+
+    def summary(self):
+        """DataFrame theo bố cục describe(include='all'): hàng SUMMARY_ROWS, cột VALUE_COLUMNS"""
+        self.fold()
+        table = {}
+        quantiles = [sketch.quantiles(QUANTILES) for sketch in self.sketches]
+        std = self.moments.sample_std
+        for n, column in enumerate(NUMERIC_COLUMNS):
+            has_rows = self.moments.count > 0
+            table[column] = [self.moments.count, np.nan, np.nan, np.nan,
+                             self.moments.mean[n] if has_rows else np.nan, std[n],
+                             self.moments.min[n] if has_rows else np.nan, *quantiles[n],
+                             self.moments.max[n] if has_rows else np.nan]
+        for column in CATEGORICAL_COLUMNS:
+            counts = self.categories[column]
+            top, freq = counts.most_common(1)[0] if counts else (np.nan, np.nan)
+            table[column] = [sum(counts.values()), len(counts), top, freq] + [np.nan] * 7
+        return pd.DataFrame(table, index=SUMMARY_ROWS)[VALUE_COLUMNS]
+
+    def snapshot(self):
+        """Dữ liệu cho biểu đồ (pie, trung bình theo Churn, histogram) và trạng thái để khôi phục"""
+        self.fold()
+        groups = dict(sorted(self.groups.items()))
+        histogram = FixedHistogram(*self.histogram_range, self.histogram_bins)
+        return {
+            "rows": self.rows,
+            "churn_counts": {churn: group["moments"].count for churn, group in groups.items()},
+            "group_means": {churn: dict(zip(GROUP_COLUMNS, group["moments"].mean.tolist()))
+                            for churn, group in groups.items()},
+            "histogram": {
+                "column": HISTOGRAM_COLUMN,
+                "edges": histogram.edges,
+                "counts": {churn: group["histogram"].counts for churn, group in groups.items()},
+            },
+            "state": self.state(),
+        }
+
+    def state(self):
+        self.fold()
+        return {
+            "config": {"sketch_k": self.sketch_k, "histogram_range": list(self.histogram_range),
+                       "histogram_bins": self.histogram_bins, "max_categories": self.max_categories},
+            "rows": self.rows,
+            "moments": self.moments.state(),
+            "sketches": [sketch.state() for sketch in self.sketches],
+            "categories": {column: dict(counts) for column, counts in self.categories.items()},
+            "groups": {churn: {"moments": group["moments"].state(), "histogram": group["histogram"].state()}
+                       for churn, group in self.groups.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        stats = cls(**state["config"])
+        stats.rows = int(state["rows"])
+        stats.moments = RunningMoments.from_state(state["moments"])
+        stats.sketches = [KllSketch.from_state(sketch) for sketch in state["sketches"]]
+        stats.categories = {column: Counter(state["categories"].get(column, {})) for column in CATEGORICAL_COLUMNS}
+        stats.groups = {churn: {"moments": RunningMoments.from_state(group["moments"]),
+                                "histogram": FixedHistogram.from_state(group["histogram"])}
+                        for churn, group in state["groups"].items()}
+        return stats
+
+
+def write_snapshot(stats, summary_path, snapshot_path, version):
+    """Ghi statistics_summary.csv và snapshot JSON (file tạm + os.replace, người đọc không thấy file ghi dở)"""
+    tmp_path = f"{summary_path}.tmp"
+    stats.summary().to_csv(tmp_path)
+    os.replace(tmp_path, summary_path)
+
+    snapshot = dict(stats.snapshot(), version=version, updated=time.time())
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, snapshot_path)
+
+
+def read_snapshot(snapshot_path):
+    with open(snapshot_path) as f:
+        return json.load(f)
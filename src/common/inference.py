@@ -0,0 +1,223 @@
+import json
+import os
+
+import joblib
+import numpy as np
+
+FEATURES = ("TotalCharges", "MonthlyCharges")
+
+# Raw (TotalCharges, MonthlyCharges) rows every loaded model must score sanely
+PROBE_ROWS = np.array([[0.0, 0.0], [20.0, 20.0], [1500.0, 70.0], [8700.0, 120.0]])
+
+
+class LogisticKernel:
+    """Logistic regression with the StandardScaler folded into its weights.
+
+    ``params`` is a flat float64 array ``[bias, w_TotalCharges, w_MonthlyCharges]``
+    so raw charges are scored with a single ``X @ w + b``, without DataFrames
+    or scikit-learn dispatch.
+    """
+
+    def __init__(self, params):
+        self.params = np.ascontiguousarray(params, dtype=np.float64)
+        if self.params.shape != (len(FEATURES) + 1,):
+            raise ValueError(f"Expected {len(FEATURES) + 1} kernel parameters, got {self.params.shape}")
+
+    @classmethod
+    def from_artifacts(cls, model, preprocessor):
+        """Build a kernel from a fitted preprocessor and a theta vector or LogisticRegression"""
+        mean, scale = _scaler_params(preprocessor)
+
+        if hasattr(model, "coef_"):
+            bias = float(np.ravel(model.intercept_)[0])
+            weights = np.ravel(model.coef_).astype(np.float64)
+        else:
+            theta = np.ravel(np.asarray(model, dtype=np.float64))
+            bias, weights = theta[0], theta[1:]
+
+        if weights.shape != mean.shape:
+            raise ValueError(f"Model has {weights.size} weights but preprocessor has {mean.size} features")
+
+        folded = weights / scale
+        return cls(np.concatenate(([bias - np.dot(folded, mean)], folded)))
+
+    def decision_function(self, X):
+        """Linear score for an (n, 2) array of raw (TotalCharges, MonthlyCharges)"""
+        X = np.asarray(X, dtype=np.float64)
+        return X @ self.params[1:] + self.params[0]
+
+    def predict_proba(self, X):
+        """Probability of churn for each row of X"""
+        return 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+
+    def predict(self, X, threshold=0.5):
+        """Binary churn prediction for each row of X"""
+        return (self.predict_proba(X) >= threshold).astype(np.int64)
+
+    def validate(self):
+        """Raise ValueError unless the kernel is usable (finite, probabilities in [0, 1])"""
+        _check_probabilities(self.params, self.predict_proba(PROBE_ROWS))
+
+
+class EncodedLogisticKernel:
+    """Logistic regression over numeric and one-hot encoded categorical columns.
+
+    Numeric columns are scored like LogisticKernel, with the scaler folded into
+    their weights. Every (column, category) pair owns one slot in a single
+    weight ``table`` and ``lookups`` maps each column's categories to their
+    slots, so encoding a batch is one dict lookup per categorical cell and the
+    one-hot part of the score is a single gather-and-sum over the (n, columns)
+    slot matrix: the sparse dot product, without building the one-hot matrix.
+    Slot 0 has weight 0 and absorbs unseen categories, like
+    ``OneHotEncoder(handle_unknown="ignore")``.
+    """
+
+    def __init__(self, bias, numeric_columns, numeric_weights, categorical_columns, lookups, table):
+        self.bias = float(bias)
+        self.numeric_columns = list(numeric_columns)
+        self.numeric_weights = np.ascontiguousarray(numeric_weights, dtype=np.float64)
+        self.categorical_columns = list(categorical_columns)
+        self.lookups = lookups
+        self.table = np.ascontiguousarray(table, dtype=np.float64)
+
+    @classmethod
+    def from_artifacts(cls, model, preprocessor):
+        """Build a kernel from a fitted ColumnTransformer (StandardScaler + OneHotEncoder) and LogisticRegression"""
+        weights = np.ravel(model.coef_).astype(np.float64)
+        bias = float(np.ravel(model.intercept_)[0])
+
+        numeric_columns, numeric_weights = [], []
+        categorical_columns, lookups, table = [], [], [0.0]
+        offset = 0
+        for _, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            columns = list(columns)
+            if hasattr(transformer, "scale_"):
+                folded = weights[offset:offset + len(columns)] / transformer.scale_
+                bias -= float(np.dot(folded, transformer.mean_))
+                numeric_columns.extend(columns)
+                numeric_weights.extend(folded)
+                offset += len(columns)
+            elif hasattr(transformer, "categories_"):
+                if getattr(transformer, "drop_idx_", None) is not None:
+                    raise ValueError("OneHotEncoder(drop=...) is not supported by the encoded kernel")
+                for column, categories in zip(columns, transformer.categories_):
+                    lookup = {}
+                    for category in categories:
+                        lookup[category] = len(table)
+                        table.append(weights[offset])
+                        offset += 1
+                    categorical_columns.append(column)
+                    lookups.append(lookup)
+            else:
+                raise ValueError(f"Unsupported transformer for kernel compilation: {transformer!r}")
+
+        if offset != weights.size:
+            raise ValueError(f"Model has {weights.size} weights but preprocessor produces {offset} features")
+        return cls(bias, numeric_columns, numeric_weights, categorical_columns, lookups, table)
+
+    def state(self):
+        """Plain-JSON parameters: the kernel is saved without scikit-learn objects"""
+        return {
+            "bias": self.bias,
+            "numeric_columns": self.numeric_columns,
+            "numeric_weights": self.numeric_weights.tolist(),
+            "categorical_columns": self.categorical_columns,
+            "lookups": self.lookups,
+            "table": self.table.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        lookups = [{str(category): int(slot) for category, slot in lookup.items()} for lookup in state["lookups"]]
+        kernel = cls(state["bias"], state["numeric_columns"], state["numeric_weights"],
+                     state["categorical_columns"], lookups, state["table"])
+        if len(kernel.numeric_weights) != len(kernel.numeric_columns) or \
+                len(kernel.lookups) != len(kernel.categorical_columns):
+            raise ValueError("Kernel state has mismatched columns and weights")
+        if any(not 0 < slot < len(kernel.table) for lookup in lookups for slot in lookup.values()):
+            raise ValueError("Kernel state has lookup slots outside its weight table")
+        return kernel
+
+    def encode(self, rows, columns):
+        """(numeric matrix, slot matrix) for rows given as sequences laid out like `columns`"""
+        if not isinstance(rows, (list, tuple)):
+            rows = list(rows)
+        position = {column: i for i, column in enumerate(columns)}
+        numeric = [position[column] for column in self.numeric_columns]
+        categorical = [(position[column], lookup) for column, lookup in zip(self.categorical_columns, self.lookups)]
+
+        X = np.array([[row[i] for i in numeric] for row in rows], dtype=np.float64)
+        slots = np.array([[lookup.get(row[i], 0) for i, lookup in categorical] for row in rows], dtype=np.int64)
+        return X.reshape(-1, len(numeric)), slots.reshape(-1, len(categorical))
+
+    def decision_function(self, rows, columns):
+        X, slots = self.encode(rows, columns)
+        return X @ self.numeric_weights + self.table[slots].sum(axis=1) + self.bias
+
+    def predict_proba(self, rows, columns):
+        """Probability of churn for each row"""
+        return 1.0 / (1.0 + np.exp(-self.decision_function(rows, columns)))
+
+    def validate(self):
+        """Raise ValueError unless the kernel is usable (finite, probabilities in [0, 1])"""
+        columns = self.numeric_columns + self.categorical_columns
+        base = [0.0] * len(self.numeric_columns) + [None] * len(self.categorical_columns)
+        # One row per known category of every column, plus an all-unknown row
+        probe = [base]
+        for j, lookup in enumerate(self.lookups):
+            for category in lookup:
+                row = list(base)
+                row[len(self.numeric_columns) + j] = category
+                probe.append(row)
+        _check_probabilities(np.append(self.numeric_weights, self.table), self.predict_proba(probe, columns))
+
+
+def _check_probabilities(params, probabilities):
+    if not np.all(np.isfinite(params)):
+        raise ValueError("Model has non-finite parameters")
+    if not np.all((probabilities >= 0.0) & (probabilities <= 1.0)):
+        raise ValueError("Model produced invalid probabilities")
+
+
+def _scaler_params(preprocessor):
+    """Extract StandardScaler mean/scale in FEATURES order"""
+    if hasattr(preprocessor, "transformers_"):
+        parts = [(transformer, list(columns)) for _, transformer, columns in preprocessor.transformers_
+                 if transformer != "drop" and len(columns) > 0]
+    else:
+        parts = [(preprocessor, list(FEATURES))]
+
+    columns, means, scales = [], [], []
+    for transformer, cols in parts:
+        if not hasattr(transformer, "scale_"):
+            raise ValueError(f"Unsupported transformer for kernel compilation: {transformer!r}")
+        n = len(cols)
+        means.append(transformer.mean_ if transformer.mean_ is not None else np.zeros(n))
+        scales.append(transformer.scale_ if transformer.scale_ is not None else np.ones(n))
+        columns.extend(cols)
+
+    if tuple(columns) != FEATURES:
+        raise ValueError(f"Kernel expects columns {FEATURES}, preprocessor has {tuple(columns)}")
+
+    return np.concatenate(means).astype(np.float64), np.concatenate(scales).astype(np.float64)
+
+
+def load_kernel(model_path, preprocessor_path):
+    """Load the pickled model/preprocessor pair and compile them into a LogisticKernel"""
+    return LogisticKernel.from_artifacts(joblib.load(model_path), joblib.load(preprocessor_path))
+
+
+def save_encoded_kernel(kernel, path):
+    """Write an EncodedLogisticKernel as JSON (tmp file + rename, so readers never see a partial file)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(kernel.state(), f)
+    os.replace(tmp_path, path)
+
+
+def load_encoded_kernel(path):
+    """Load a full-feature EncodedLogisticKernel saved by save_encoded_kernel"""
+    with open(path) as f:
+        return EncodedLogisticKernel.from_state(json.load(f))
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+from common.inference import load_kernel
+
+ModelVersion = namedtuple("ModelVersion", ["version", "kernel", "loaded_at"])
+
+
+class ModelRegistry:
+    """Hot-reloadable model/preprocessor pair.
+
+    A watcher thread polls the artifacts every ``poll_secs``. A new version is
+    detected from ``<model>.manifest.json`` when one exists (deployments write
+    it last, after the pickles), otherwise from the files' mtime/size once they
+    have stopped changing for one poll. The candidate is compiled by ``loader``
+    and checked with ``kernel.validate()`` off the hot path, then published
+    with a single assignment to ``current``; callers read ``current`` once per
+    batch, so a batch is always scored by one version and a bad artifact never
+    replaces a working model.
+    """
+
+    def __init__(self, model_path, preprocessor_path, poll_secs=5.0, log=None, loader=load_kernel):
+        self.model_path = model_path
+        self.preprocessor_path = preprocessor_path
+        # preprocessor_path is None for single-file artifacts (a saved kernel)
+        self.paths = [path for path in (model_path, preprocessor_path) if path]
+        self.loader = loader
+        self.manifest_path = os.path.splitext(model_path)[0] + ".manifest.json"
+        self.poll_secs = float(poll_secs)
+        self.log = log or (lambda message: None)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher_pid = None
+        self._seen = self._signature()
+        self._changed = None
+        # The first load is synchronous and fails loudly, like load_kernel
+        self._current = self._load()
+
+    @classmethod
+    def from_conf(cls, conf, model_path, preprocessor_path, log=None, loader=load_kernel):
+        """Registry polling every churn.model.reload_secs seconds (0 disables reloading)"""
+        return cls(model_path, preprocessor_path, poll_secs=conf.get("churn.model.reload_secs", 5.0), log=log,
+                   loader=loader)
+
+    @property
+    def current(self):
+        """The ModelVersion to score the next batch with"""
+        if self.poll_secs > 0 and self._watcher_pid != os.getpid():
+            # Threads do not survive fork (gunicorn preload): start one per process
+            self._start_watcher()
+        return self._current
+
+    def _start_watcher(self):
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            self._stop.clear()
+            threading.Thread(target=self._watch, name="model-registry", daemon=True).start()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_secs):
+            try:
+                self.check()
+            except Exception as e:
+                self.log(f"Model registry error: {e}")
+
+    def _signature(self):
+        paths = [self.manifest_path] if os.path.exists(self.manifest_path) else \
+            self.paths
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((path, None, None))
+        return signature
+
+    def _version(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                return str(json.load(f)["version"])
+        digest = hashlib.sha1()
+        for path in self.paths:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        name = os.path.splitext(os.path.basename(self.model_path))[0]
+        return f"{name}-{digest.hexdigest()[:10]}"
+
+    def _load(self):
+        """Load and validate the artifacts on disk; raises if they are unusable"""
+        version = self._version()
+        kernel = self.loader(*self.paths)
+        kernel.validate()
+        return ModelVersion(version, kernel, time.time())
+
+    def check(self):
+        """Load a new version if the artifacts changed; returns True when it was swapped in"""
+        signature = self._signature()
+        if signature == self._seen:
+            self._changed = None
+            return False
+        if signature != self._changed and not os.path.exists(self.manifest_path):
+            # Wait one more poll: the files may still be being written
+            self._changed = signature
+            return False
+
+        self._seen, self._changed = signature, None
+        try:
+            candidate = self._load()
+        except Exception as e:
+            self.log(f"Rejected new model, keeping {self._current.version}: {e}")
+            return False
+
+        if candidate.version == self._current.version:
+            return False
+        previous, self._current = self._current, candidate
+        self.log(f"Model {previous.version} -> {candidate.version}")
+        return True
+
+    def stop(self):
+        self._stop.set()
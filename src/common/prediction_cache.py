@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """Bounded LRU/TTL cache of churn probabilities keyed on rounded features.
+
+    The model only sees (TotalCharges, MonthlyCharges), and the same plan
+    pairs recur constantly, so the probability of a pair rounded to
+    ``decimals`` places is computed once and reused. Entries expire after
+    ``ttl_secs`` (if set), the least recently used entry is evicted beyond
+    ``max_entries``, and the whole cache is dropped when any of
+    ``model_paths`` changes on disk (checked at most every ``check_secs``).
+    """
+
+    def __init__(self, model_paths=(), max_entries=10000, ttl_secs=None, decimals=2, check_secs=1.0):
+        self.model_paths = list(model_paths)
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_secs = float(ttl_secs) if ttl_secs else None
+        self.decimals = int(decimals)
+        self.check_secs = float(check_secs)
+
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._signature = self._model_signature()
+        self._last_check = time.monotonic()
+
+    @classmethod
+    def from_conf(cls, conf, model_paths):
+        """Build a cache from churn.cache.* keys; None unless churn.cache.enabled is set"""
+        if not conf.get("churn.cache.enabled", False):
+            return None
+        options = {}
+        for key in ("max_entries", "ttl_secs", "decimals"):
+            conf_key = f"churn.cache.{key}"
+            if conf_key in conf:
+                options[key] = conf[conf_key]
+        return cls(model_paths, **options)
+
+    def _model_signature(self):
+        signature = []
+        for path in self.model_paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return signature
+
+    def _check_models(self):
+        """Drop every entry if a model file was replaced since the last check"""
+        now = time.monotonic()
+        if now - self._last_check < self.check_secs:
+            return
+        self._last_check = now
+        signature = self._model_signature()
+        if signature != self._signature:
+            self._signature = signature
+            self.entries.clear()
+            self.invalidations += 1
+
+    def key(self, total_charges, monthly_charges, version=None):
+        return version, round(float(total_charges), self.decimals), round(float(monthly_charges), self.decimals)
+
+    def get(self, key):
+        """Cached probability for `key`, or None"""
+        with self._lock:
+            self._check_models()
+            entry = self.entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, probability):
+        expires = time.monotonic() + self.ttl_secs if self.ttl_secs else None
+        with self._lock:
+            self.entries[key] = (probability, expires)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def score(self, X, predict_proba, version=None):
+        """Probabilities for an (n, 2) array, calling `predict_proba` only for cache misses.
+
+        `version` identifies the model behind `predict_proba`, so entries of a
+        replaced model are never served for the new one. Returns
+        (probabilities, number of hits).
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, 2)
+        keys = [self.key(total_charges, monthly_charges, version) for total_charges, monthly_charges in X]
+        probabilities = np.empty(len(keys), dtype=np.float64)
+        missing = []
+        for i, key in enumerate(keys):
+            probability = self.get(key)
+            if probability is None:
+                missing.append(i)
+            else:
+                probabilities[i] = probability
+
+        if missing:
+            probabilities[missing] = predict_proba(X[missing])
+            for i in missing:
+                self.put(keys[i], float(probabilities[i]))
+        return probabilities, len(keys) - len(missing)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0,
+            "size": len(self.entries),
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,33 @@
+import time
+
+
+class TokenBucket:
+    """Non-blocking token bucket: ``rate`` tokens per second, at most ``burst`` saved up.
+
+    ``try_acquire()`` never sleeps; a spout calls it from ``next_tuple`` and
+    simply emits nothing when it returns False, leaving the wait to Storm's
+    spout wait strategy. A rate of 0 (or less) means unlimited.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(burst) if burst else max(1.0, self.rate / 10)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    @classmethod
+    def from_conf(cls, conf, prefix, default_rate=0):
+        """Bucket from <prefix>.rate (tuples/s, 0 = unlimited) and <prefix>.burst"""
+        return cls(conf.get(f"{prefix}.rate", default_rate), conf.get(f"{prefix}.burst"))
+
+    def try_acquire(self, n=1):
+        if self.rate <= 0:
+            return True
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= n:
+            self.tokens -= n
+            return True
+        return False
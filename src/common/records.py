@@ -0,0 +1,43 @@
+from collections import namedtuple
+
+TELCO_COLUMNS = [
+    "customerID", "gender", "SeniorCitizen", "Partner", "Dependents",
+    "tenure", "PhoneService", "MultipleLines", "InternetService",
+    "OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport",
+    "StreamingTV", "StreamingMovies", "Contract", "PaperlessBilling",
+    "PaymentMethod", "MonthlyCharges", "TotalCharges", "Churn"
+]
+
+CustomerRecord = namedtuple("CustomerRecord", TELCO_COLUMNS)
+
+
+def _to_int(value):
+    value = value.strip()
+    return int(value) if value else 0
+
+
+def _to_float(value):
+    # TotalCharges để trống với khách hàng mới (tenure = 0)
+    value = value.strip()
+    return float(value) if value else 0.0
+
+
+_CONVERTERS = [
+    _to_int if column in ("SeniorCitizen", "tenure")
+    else _to_float if column in ("MonthlyCharges", "TotalCharges")
+    else str.strip
+    for column in TELCO_COLUMNS
+]
+
+
+def check_header(header):
+    """Raise ValueError if a CSV header does not match the Telco layout"""
+    if [column.strip() for column in header] != TELCO_COLUMNS:
+        raise ValueError(f"Unexpected Telco CSV header: {header}")
+
+
+def parse_row(row):
+    """Parse one csv.reader row into a typed CustomerRecord"""
+    if len(row) != len(TELCO_COLUMNS):
+        raise ValueError(f"Expected {len(TELCO_COLUMNS)} fields, got {len(row)}")
+    return CustomerRecord._make(convert(value) for convert, value in zip(_CONVERTERS, row))
@@ -0,0 +1,16 @@
+from collections import namedtuple
+
+# Bố cục cố định theo vị trí cho từng stream: tên field chỉ khai báo một lần trong
+# `outputs`, tuple trên đường truyền chỉ là một mảng giá trị (JSON hoặc msgpack)
+# thay vì một dict lặp lại tên khóa ở mỗi tuple.
+
+# Stream 'charges': key = (TotalCharges, MonthlyCharges), value = Churn
+ChargesTuple = namedtuple("ChargesTuple", ["key", "value"])
+
+# Stream 'customer' (TelcoSourceSpout, DataCustomerSpout): value = các cột Telco trừ customerID
+CustomerTuple = namedtuple("CustomerTuple", ["customerID", "value"])
+
+
+def fields(schema):
+    """Danh sách field cho `outputs` của spout/bolt"""
+    return list(schema._fields)
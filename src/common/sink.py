@@ -0,0 +1,243 @@
+import io
+import os
+import csv
+import fcntl
+import time
+from collections import Counter
+
+
+# Files held by live sinks of this process, by (st_dev, st_ino). Record locks
+# only exclude other processes, so sinks in one process are counted here.
+_held = Counter()
+
+
+def hold(file):
+    """Mark an open file as in use by a live sink until ``release``; returns the key to release"""
+    fcntl.lockf(file, fcntl.LOCK_SH)
+    stat = os.fstat(file.fileno())
+    key = (stat.st_dev, stat.st_ino)
+    _held[key] += 1
+    return key
+
+
+def release(key):
+    _held[key] -= 1
+    if _held[key] <= 0:
+        del _held[key]
+
+
+def in_use(file):
+    """True if a live sink in this or another process holds the file"""
+    stat = os.fstat(file.fileno())
+    if (stat.st_dev, stat.st_ino) in _held:
+        return True
+    try:
+        fcntl.lockf(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return True
+    return False
+
+
+class PendingAcks:
+    """Tuples whose rows sit in a sink's buffer.
+
+    A bolt with ``auto_ack = False`` passes each tuple to ``writerow`` and the
+    sink acks it only after the row has been written out (``commit``); if the
+    write fails the tuples are failed instead (``abort``), so the spout replays
+    them. Without an ``ack`` callback anchors are ignored.
+    """
+
+    def __init__(self, ack=None, fail=None):
+        self.ack = ack
+        self.fail = fail
+        self.anchors = []
+
+    def add(self, anchor):
+        if anchor is not None and self.ack is not None:
+            self.anchors.append(anchor)
+
+    def commit(self):
+        anchors, self.anchors = self.anchors, []
+        for anchor in anchors:
+            self.ack(anchor)
+
+    def abort(self):
+        anchors, self.anchors = self.anchors, []
+        if self.fail is not None:
+            for anchor in anchors:
+                self.fail(anchor)
+
+    def __len__(self):
+        return len(self.anchors)
+
+
+def rolled_path(path):
+    """Unused name for an output written with an older layout: data/x.csv -> data/x.20240101-120000.csv"""
+    stem, ext = os.path.splitext(path)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    rolled = f"{stem}.{stamp}{ext}"
+    n = 1
+    while os.path.exists(rolled):
+        rolled = f"{stem}.{stamp}-{n}{ext}"
+        n += 1
+    return rolled
+
+
+class BufferedCsvSink:
+    """Append-only CSV writer that group-commits rows to disk.
+
+    Rows are formatted into an in-memory buffer and written out with a single
+    ``write()`` + ``flush()`` once ``max_rows`` rows or ``max_bytes`` characters
+    are buffered, or ``max_secs`` has passed since the last flush. Bolts call
+    ``tick()`` from ``process_tick`` so idle buffers still reach disk, and
+    ``close()`` from ``cleanup`` to flush and fsync. The header check and each
+    flush hold an exclusive ``flock``, so parallel tasks of a bolt can append
+    to the same file without duplicate headers or interleaved rows.
+
+    ``writerow(row, anchor)`` with ``ack``/``fail`` callbacks acks the tuple
+    once its row has been handed to the OS by a flush, so a crashed worker
+    never loses rows that the spout already considers done.
+    """
+
+    def __init__(self, path, header=None, max_rows=500, max_bytes=1 << 20, max_secs=1.0,
+                 encoding="utf-8", ack=None, fail=None):
+        self.path = path
+        self.max_rows = max(1, int(max_rows))
+        self.max_bytes = max(1, int(max_bytes))
+        self.max_secs = float(max_secs)
+
+        self.encoding = encoding
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.buffered_rows = 0
+        self.last_flush = time.time()
+        self.pending = PendingAcks(ack, fail)
+
+        self.file = self._open(header)
+
+    def _open(self, header):
+        """Open the file for appending, writing the header to a new file.
+
+        An existing file whose header differs (the bolt's output layout has
+        changed) is renamed by ``rolled_path`` and a fresh file is started, so
+        old and new rows never share one header. A file that another live sink
+        still holds is never renamed: that is two components configured with
+        the same path, and raises ValueError.
+        """
+        while True:
+            file = open(self.path, mode="a+", encoding=self.encoding, newline="")
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                stat = os.fstat(file.fileno())
+                try:
+                    current = os.stat(self.path)
+                except FileNotFoundError:
+                    current = None
+                if current is None or (current.st_dev, current.st_ino) != (stat.st_dev, stat.st_ino):
+                    # Another task rolled the file after we opened it
+                    file.close()
+                    continue
+                if header and not self._has_header(file, stat, header):
+                    if in_use(file):
+                        raise ValueError(f"{self.path} is open in another sink with a different header")
+                    os.rename(self.path, rolled_path(self.path))
+                    file.close()
+                    continue
+                # Marked while the flock is held, so a sink opened later sees it
+                self.held = hold(file)
+                return file
+            except BaseException:
+                file.close()
+                raise
+            finally:
+                if not file.closed:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+
+    def _has_header(self, file, stat, header):
+        """True if the file starts with ``header``; an empty file gets it written"""
+        if stat.st_size == 0:
+            file.write(self._format(header))
+            file.flush()
+            return True
+        file.seek(0)
+        return next(csv.reader([file.readline()]), None) == [str(name) for name in header]
+
+    @classmethod
+    def from_conf(cls, conf, path, header=None, **defaults):
+        """Build a sink from churn.sink.* keys in the component config"""
+        options = dict(defaults)
+        for key in ("max_rows", "max_bytes", "max_secs"):
+            conf_key = f"churn.sink.{key}"
+            if conf_key in conf:
+                options[key] = conf[conf_key]
+        return cls(path, header=header, **options)
+
+    def writerow(self, row, anchor=None):
+        self.writer.writerow(row)
+        self.pending.add(anchor)
+        self.buffered_rows += 1
+        if (self.buffered_rows >= self.max_rows or
+                self.buffer.tell() >= self.max_bytes or
+                time.time() - self.last_flush >= self.max_secs):
+            self.flush()
+
+    def tick(self):
+        """Flush buffered rows that have waited longer than max_secs"""
+        if self.buffered_rows and time.time() - self.last_flush >= self.max_secs:
+            self.flush()
+
+    def _format(self, row):
+        line = io.StringIO()
+        csv.writer(line).writerow(row)
+        return line.getvalue()
+
+    def flush(self):
+        if self.buffered_rows:
+            try:
+                fcntl.flock(self.file, fcntl.LOCK_EX)
+                try:
+                    self.file.write(self.buffer.getvalue())
+                    self.file.flush()
+                finally:
+                    fcntl.flock(self.file, fcntl.LOCK_UN)
+            except Exception:
+                # The rows are dropped and their tuples replayed by the spout
+                self.pending.abort()
+                raise
+            finally:
+                self.buffer.seek(0)
+                self.buffer.truncate()
+                self.buffered_rows = 0
+            self.pending.commit()
+        self.file.flush()
+        self.last_flush = time.time()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        os.fsync(self.file.fileno())
+        release(self.held)
+        self.file.close()
+
+
+def open_sink(conf, path, header, ack=None, fail=None, **defaults):
+    """Open the output sink selected by churn.sink.format ("csv" or "parquet").
+
+    The parquet format writes rolling part files into a directory named after
+    the CSV file, e.g. data/predicted_churn/ instead of data/predicted_churn.csv.
+    ``ack``/``fail`` are the bolt's callbacks for tuples passed to ``writerow``.
+    """
+    output_format = conf.get("churn.sink.format", "csv")
+    if output_format == "csv":
+        return BufferedCsvSink.from_conf(conf, path, header=header, ack=ack, fail=fail, **defaults)
+    if output_format == "parquet":
+        from common.columnar_sink import ParquetSink
+
+        options = {}
+        for key in ("max_rows", "max_secs", "rows_per_file", "file_secs"):
+            conf_key = f"churn.sink.{key}"
+            if conf_key in conf:
+                options[key] = conf[conf_key]
+        return ParquetSink(os.path.splitext(path)[0], header, ack=ack, fail=fail, **options)
+    raise ValueError(f"Unknown churn.sink.format: {output_format!r}")
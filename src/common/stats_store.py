@@ -0,0 +1,104 @@
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+BUCKET_SECS = 60
+RETENTION_SECS = 24 * 3600
+
+
+class StatsStore:
+    """Running pipeline counters in a SQLite WAL database shared by bolts and the web app.
+
+    Writers accumulate increments in memory with ``add()`` and commit them in
+    one transaction from ``flush()``/``tick()``, so the database sees one write
+    per interval rather than one per tuple. All-time totals live in
+    ``counters``; per-minute ``buckets`` back the windowed rates and are pruned
+    after RETENTION_SECS. Readers get totals with a single primary-key scan,
+    independent of how long the topology has been running.
+    """
+
+    def __init__(self, path, flush_secs=1.0):
+        self.path = path
+        self.flush_secs = float(flush_secs)
+        self.pending = Counter()
+        self.pending_buckets = Counter()
+        self.last_flush = time.time()
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS buckets (bucket INTEGER NOT NULL, name TEXT NOT NULL, "
+                     "value INTEGER NOT NULL, PRIMARY KEY (bucket, name))")
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared across threads (Flask is threaded)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, name, n=1, timestamp=None):
+        """Buffer an increment of counter `name`"""
+        if not n:
+            return
+        bucket = int((timestamp or time.time()) // BUCKET_SECS) * BUCKET_SECS
+        self.pending[name] += n
+        self.pending_buckets[(bucket, name)] += n
+
+    def tick(self):
+        """Commit buffered increments older than flush_secs"""
+        if self.pending and time.time() - self.last_flush >= self.flush_secs:
+            self.flush()
+
+    def flush(self):
+        """Commit buffered increments; kept for the next attempt if the database is busy"""
+        if not self.pending:
+            self.last_flush = time.time()
+            return True
+
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                list(self.pending.items())
+            )
+            conn.executemany(
+                "INSERT INTO buckets (bucket, name, value) VALUES (?, ?, ?) "
+                "ON CONFLICT(bucket, name) DO UPDATE SET value = value + excluded.value",
+                [(bucket, name, n) for (bucket, name), n in self.pending_buckets.items()]
+            )
+            conn.execute("DELETE FROM buckets WHERE bucket < ?", (time.time() - RETENTION_SECS,))
+            conn.execute("COMMIT")
+        except sqlite3.OperationalError:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            return False
+
+        self.pending.clear()
+        self.pending_buckets.clear()
+        self.last_flush = time.time()
+        return True
+
+    def totals(self):
+        """All-time counter values"""
+        return dict(self._connection().execute("SELECT name, value FROM counters"))
+
+    def window_totals(self, window_secs):
+        """Counter increments within the last `window_secs` seconds (minute resolution)"""
+        since = int((time.time() - window_secs) // BUCKET_SECS + 1) * BUCKET_SECS
+        return dict(self._connection().execute(
+            "SELECT name, SUM(value) FROM buckets WHERE bucket >= ? GROUP BY name", (since,)
+        ))
+
+    def close(self):
+        self.flush()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
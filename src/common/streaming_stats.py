@@ -0,0 +1,181 @@
+import math
+import random
+
+import numpy as np
+
+
+class RunningMoments:
+    """Per-column count, mean, variance, min and max accumulated in one pass (Welford/Chan).
+
+    ``update()`` folds in a whole (n, d) chunk at once: the chunk's own mean
+    and sum of squared deviations are computed with NumPy and merged with the
+    running totals, which is numerically stable and never holds more than one
+    chunk in memory. A single row is a chunk of one, i.e. Welford's update.
+    """
+
+    def __init__(self, n_features):
+        self.count = 0
+        self.mean = np.zeros(n_features, dtype=np.float64)
+        self.m2 = np.zeros(n_features, dtype=np.float64)
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+
+    def update(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.mean))
+        n = X.shape[0]
+        if n == 0:
+            return
+        chunk_mean = X.mean(axis=0)
+        chunk_m2 = ((X - chunk_mean) ** 2).sum(axis=0)
+        self._merge(n, chunk_mean, chunk_m2)
+        self.min = np.minimum(self.min, X.min(axis=0))
+        self.max = np.maximum(self.max, X.max(axis=0))
+
+    def merge(self, other):
+        """Combine with moments accumulated elsewhere (another chunk stream or process)"""
+        if other.count:
+            self._merge(other.count, other.mean, other.m2)
+            self.min = np.minimum(self.min, other.min)
+            self.max = np.maximum(self.max, other.max)
+
+    def _merge(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+    @property
+    def variance(self):
+        """Population variance (ddof=0), as used by StandardScaler"""
+        return self.m2 / self.count if self.count else np.zeros_like(self.m2)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def sample_std(self):
+        """Standard deviation with ddof=1, as reported by DataFrame.describe()"""
+        if self.count < 2:
+            return np.full_like(self.m2, np.nan)
+        return np.sqrt(self.m2 / (self.count - 1))
+
+    def state(self):
+        return {"count": self.count, "mean": self.mean.tolist(), "m2": self.m2.tolist(),
+                "min": self.min.tolist(), "max": self.max.tolist()}
+
+    @classmethod
+    def from_state(cls, state):
+        moments = cls(len(state["mean"]))
+        moments.count = int(state["count"])
+        for name in ("mean", "m2", "min", "max"):
+            setattr(moments, name, np.asarray(state[name], dtype=np.float64))
+        return moments
+
+
+class KllSketch:
+    """KLL quantile sketch (Karnin, Lang & Liberty): approximate quantiles in O(k) memory.
+
+    Items enter level 0; when a level reaches its capacity it is sorted and
+    every other item (random offset) is promoted to the next level with
+    double the weight. Capacities shrink geometrically (factor 2/3) towards
+    the lower levels, so the sketch holds about 3k items however long the
+    stream is, with rank error around 1.7/k.
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = int(k)
+        self.count = 0
+        self.compactors = [[]]
+        self.size = 0
+        self.max_size = self._capacity(0)
+        self.random = random.Random(seed)
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def update(self, value):
+        self.compactors[0].append(value)
+        self.count += 1
+        self.size += 1
+        if self.size >= self.max_size:
+            self._compress()
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        self.max_size = sum(self._capacity(level) for level in range(len(self.compactors)))
+        self.size = sum(len(items) for items in self.compactors)
+        self._compress()
+
+    def _compress(self):
+        for level in range(len(self.compactors)):
+            if len(self.compactors[level]) < self._capacity(level):
+                continue
+            if level + 1 == len(self.compactors):
+                self.compactors.append([])
+                self.max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+            items = sorted(self.compactors[level])
+            # Số phần tử lẻ: phần tử lớn nhất ở lại level hiện tại
+            keep = [items.pop()] if len(items) % 2 else []
+            self.compactors[level + 1].extend(items[self.random.random() < 0.5::2])
+            self.compactors[level] = keep
+
+            self.size = sum(len(compactor) for compactor in self.compactors)
+            if self.size < self.max_size:
+                break
+
+    def quantiles(self, qs):
+        """Approximate values at the given quantiles (0..1); NaN while the sketch is empty"""
+        if not self.count:
+            return [float("nan")] * len(qs)
+        weighted = sorted((value, 2 ** level) for level, items in enumerate(self.compactors) for value in items)
+        values = np.array([value for value, _ in weighted], dtype=np.float64)
+        ranks = np.cumsum([weight for _, weight in weighted])
+        indices = np.searchsorted(ranks, np.asarray(qs) * ranks[-1], side="left")
+        return values[np.minimum(indices, len(values) - 1)].tolist()
+
+    def state(self):
+        return {"k": self.k, "count": self.count, "compactors": self.compactors}
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state["k"])
+        sketch.count = int(state["count"])
+        sketch.compactors = [list(items) for items in state["compactors"]]
+        sketch.size = sum(len(items) for items in sketch.compactors)
+        sketch.max_size = sum(sketch._capacity(level) for level in range(len(sketch.compactors)))
+        return sketch
+
+
+class FixedHistogram:
+    """Counts over ``bins`` equal-width bins on [low, high); out-of-range values go to the edge bins"""
+
+    def __init__(self, low, high, bins):
+        self.low = float(low)
+        self.high = float(high)
+        self.counts = [0] * int(bins)
+        self.width = (self.high - self.low) / len(self.counts)
+
+    def update(self, value):
+        index = int((value - self.low) // self.width)
+        self.counts[min(max(index, 0), len(self.counts) - 1)] += 1
+
+    @property
+    def edges(self):
+        return [self.low + i * self.width for i in range(len(self.counts) + 1)]
+
+    def state(self):
+        return {"low": self.low, "high": self.high, "counts": self.counts}
+
+    @classmethod
+    def from_state(cls, state):
+        histogram = cls(state["low"], state["high"], len(state["counts"]))
+        histogram.counts = [int(count) for count in state["counts"]]
+        return histogram
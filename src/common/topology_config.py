@@ -0,0 +1,67 @@
+import json
+import os
+
+from streamparse import Grouping
+
+CONFIG_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../config.json"))
+
+_GROUPINGS = {
+    "shuffle": Grouping.SHUFFLE,
+    "local_or_shuffle": Grouping.LOCAL_OR_SHUFFLE,
+    "global": Grouping.GLOBAL,
+    "all": Grouping.ALL,
+    "none": Grouping.NONE,
+}
+
+
+def parse_grouping(grouping):
+    """"shuffle", "global", ... hoặc {"fields": [...]} / danh sách tên field -> Grouping của streamparse"""
+    if grouping is None:
+        return Grouping.SHUFFLE
+    if isinstance(grouping, dict):
+        grouping = grouping["fields"]
+    if isinstance(grouping, (list, tuple)):
+        return Grouping.fields(*grouping)
+    try:
+        return _GROUPINGS[grouping.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown grouping {grouping!r}; expected one of {sorted(_GROUPINGS)} or a field list")
+
+
+class ComponentConfig:
+    """Parallelism và grouping của từng component, đọc từ mục "components" của một env trong config.json.
+
+        "envs": {"prod": {..., "components": {
+            "churn_predictor_full_bolt": {"par": 8, "grouping": {"fields": ["customerID"]}}
+        }}}
+
+    Env được chọn bằng biến môi trường CHURN_ENV; nếu không có và config.json
+    chỉ có một env thì dùng env đó (giống ``sparse submit``). Component không
+    được khai báo giữ giá trị mặc định trong định nghĩa topology.
+    """
+
+    def __init__(self, components=None):
+        self.components = components or {}
+
+    @classmethod
+    def load(cls, env_name=None, config_file=CONFIG_FILE):
+        env_name = env_name or os.environ.get("CHURN_ENV")
+        try:
+            with open(config_file) as f:
+                envs = json.load(f).get("envs", {})
+        except (OSError, ValueError):
+            return cls()
+        if env_name is None and len(envs) == 1:
+            env_name = next(iter(envs))
+        if env_name is not None and env_name not in envs:
+            raise ValueError(f'No "{env_name}" environment in {config_file}')
+        return cls(envs.get(env_name, {}).get("components"))
+
+    def spec(self, name, inputs=None, par=1, grouping=None):
+        """Tham số ``par``/``inputs`` cho ``Component.spec()``; mọi input dùng chung một grouping"""
+        options = self.components.get(name, {})
+        kwargs = {"par": int(options.get("par", par))}
+        if inputs is not None:
+            grouping = parse_grouping(options.get("grouping", grouping))
+            kwargs["inputs"] = {stream: grouping for stream in inputs}
+        return kwargs
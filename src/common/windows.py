@@ -0,0 +1,82 @@
+FIELDS = ("count", "churn", "probability")
+
+
+class SlidingWindow:
+    """Sliding-window sums over a ring of ``buckets`` time buckets.
+
+    The window of ``size_secs`` is split into buckets of ``size_secs /
+    buckets`` seconds. Each bucket holds (count, churn, probability sum) and
+    the window keeps running totals, so ``add()`` is O(1) and sliding the
+    window only subtracts and clears the buckets that fell out of it: at most
+    ``buckets`` per call, however long the window was idle.
+    """
+
+    def __init__(self, size_secs, buckets):
+        self.size_secs = float(size_secs)
+        self.width = self.size_secs / int(buckets)
+        self.sums = [[0, 0, 0.0] for _ in range(int(buckets))]
+        self.totals = [0, 0, 0.0]
+        self.epoch = None
+
+    def advance(self, now):
+        """Slide the window so that it ends at ``now``"""
+        epoch = int(now // self.width)
+        if self.epoch is None:
+            self.epoch = epoch
+            return
+        if epoch <= self.epoch:
+            return
+        n = len(self.sums)
+        for expired in range(self.epoch + 1, min(epoch, self.epoch + n) + 1):
+            bucket = self.sums[expired % n]
+            for i in range(3):
+                self.totals[i] -= bucket[i]
+            bucket[:] = [0, 0, 0.0]
+        self.epoch = epoch
+
+    def add(self, now, churn, probability):
+        self.advance(now)
+        bucket = self.sums[self.epoch % len(self.sums)]
+        for i, value in enumerate((1, churn, probability)):
+            bucket[i] += value
+            self.totals[i] += value
+
+    def result(self, now):
+        self.advance(now)
+        return dict(zip(FIELDS, self.totals))
+
+
+class TumblingWindow:
+    """Sums over consecutive, non-overlapping windows of ``size_secs``; closed windows are returned once"""
+
+    def __init__(self, size_secs):
+        self.size_secs = float(size_secs)
+        self.totals = [0, 0, 0.0]
+        self.epoch = None
+
+    def advance(self, now):
+        """Close the current window if ``now`` is past it; returns (window_end, totals) or None"""
+        epoch = int(now // self.size_secs)
+        if self.epoch is None or epoch == self.epoch:
+            self.epoch = epoch
+            return None
+        closed = ((self.epoch + 1) * self.size_secs, dict(zip(FIELDS, self.totals)))
+        self.epoch, self.totals = epoch, [0, 0, 0.0]
+        return closed
+
+    def add(self, now, churn, probability):
+        closed = self.advance(now)
+        for i, value in enumerate((1, churn, probability)):
+            self.totals[i] += value
+        return closed
+
+
+def parse_size(size):
+    """"30s", "5m", "1h" hoặc số giây -> số giây"""
+    if isinstance(size, (int, float)):
+        return float(size)
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    size = size.strip()
+    if size[-1] in units:
+        return float(size[:-1]) * units[size[-1]]
+    return float(size)
@@ -0,0 +1,258 @@
+import csv
+import json
+import os
+import time
+from array import array
+from collections import Counter, deque
+
+from streamparse.spout import Spout
+
+from common.rate_limit import TokenBucket
+
+
+class ReliableCsvSpout(Spout):
+    """At-least-once CSV spout: message ID theo vị trí dòng, replay khi fail, checkpoint offset đã commit.
+
+    Mỗi dòng đọc được nhận một số thứ tự ``seq`` tăng dần; dòng phát một tuple
+    trên mỗi stream trong ``streams`` với message ID ``seq * len(streams) + i``.
+    Thay vì giữ bản sao tuple, cửa sổ pending chỉ lưu byte offset, số dòng và
+    một bitmap các stream chưa ack cho mỗi dòng (~17 byte/dòng); khi fail, dòng
+    được đọc lại từ file tại offset đó và chỉ phát lại trên stream bị fail.
+
+    Offset của dòng đầu tiên chưa được ack hết (mọi dòng trước nó đã xong) được
+    ghi vào file checkpoint, nên khi khởi động lại spout đọc tiếp từ đó thay vì
+    đọc lại cả file hoặc bỏ qua dòng. Mỗi bản ghi phải nằm trên một dòng vật lý.
+
+    Khi spout chạy với par > 1, task thứ i trong n task chỉ phát các dòng có
+    ``(line - 1) % n == i`` và có file checkpoint riêng.
+
+    Tốc độ phát (kể cả replay) bị giới hạn bởi TokenBucket ``churn.spout.rate``
+    / ``churn.spout.burst``; token chỉ bị lấy khi spout thực sự phát dòng, không
+    lấy khi đang chờ ``max_pending`` hay ``resume_at``.
+
+    Lớp con khai báo ``streams`` và ``values(line, row)``; ``on_eof()`` quyết
+    định dừng (mặc định) hay ``rewind()`` để đọc vòng lại.
+    """
+    # Tên stream theo thứ tự tuple do values() trả về; None = stream mặc định
+    streams = [None]
+    source = "data/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+    # churn.spout.rate mặc định (tuple/s); 0 = không giới hạn
+    default_rate = 0
+
+    # Số lần phát lại tối đa cho một message ID, sau đó coi như đã ack (giống pystorm ReliableSpout)
+    max_fails = 3
+
+    def initialize(self, conf, context):
+        base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+        self.source_path = conf.get("churn.source.path", os.path.join(base_path, self.source))
+
+        self.max_pending = int(conf.get("churn.spout.max_pending", 1000))
+        self.max_fails = int(conf.get("churn.spout.max_fails", self.max_fails))
+        self.checkpoint_secs = float(conf.get("churn.spout.checkpoint_secs", 1.0))
+        # Điều tiết không dùng sleep: next_tuple không phát gì khi hết token hoặc trước resume_at
+        self.rate_limit = TokenBucket.from_conf(conf, "churn.spout", default_rate=self.default_rate)
+        self.resume_at = 0.0
+        checkpoint_dir = conf.get("churn.spout.checkpoint_dir", os.path.join(base_path, "data/checkpoints"))
+        name = getattr(self, "component_name", None) or type(self).__name__
+        self.shard, self.shards = self._shard(context, name)
+        if self.shards > 1:
+            name = f"{name}-{self.shard}"
+        self.checkpoint_path = os.path.join(checkpoint_dir, f"{name}.json") if checkpoint_dir else None
+
+        # Cửa sổ pending: phần tử i ứng với seq = first_seq + i; mọi phần tử trước head đã xong
+        self.first_seq = 0
+        self.head = 0
+        self.offsets = array('q')
+        self.lines = array('q')
+        self.masks = bytearray()
+        self.failures = Counter()
+        self.replay = deque()
+
+        self.finished = False
+        self.checkpointed = None
+        self.checkpointed_at = 0.0
+
+        self.file = open(self.source_path, mode="rb")
+        self.header = self._parse(self.file.readline())
+        self.data_start = self.file.tell()
+        self.line = 0
+        self.replay_file = open(self.source_path, mode="rb")
+
+        self._restore()
+
+    @staticmethod
+    def _shard(context, name):
+        """(chỉ số task, số task) của component này, theo thứ tự task id"""
+        tasks = sorted(int(task) for task, component in context.get("task->component", {}).items()
+                       if component == name)
+        task_id = context.get("taskid")
+        if task_id is None or int(task_id) not in tasks:
+            return 0, 1
+        return tasks.index(int(task_id)), len(tasks)
+
+    @staticmethod
+    def _parse(raw):
+        return next(csv.reader([raw.decode("utf-8")]))
+
+    def values(self, line, row):
+        """Tuple cho từng stream trong ``streams`` (None = không phát); ValueError = bỏ qua dòng"""
+        raise NotImplementedError
+
+    def on_eof(self):
+        self.finished = True
+        self.log(f"Finished reading {self.source_path}: {self.line} rows")
+
+    def rewind(self):
+        """Đọc lại file từ dòng dữ liệu đầu tiên"""
+        self.file.seek(self.data_start)
+        self.line = 0
+        self.finished = False
+
+    def next_tuple(self):
+        self._maybe_checkpoint()
+
+        if self.replay:
+            if self.rate_limit.try_acquire():
+                self._replay(self.replay.popleft())
+            return
+        if self.finished or time.time() < self.resume_at:
+            return
+        if self.max_pending and len(self.masks) - self.head >= self.max_pending:
+            return
+        if not self.rate_limit.try_acquire():
+            return
+
+        offset = self.file.tell()
+        raw = self.file.readline()
+        # Bỏ qua các dòng thuộc task khác (par > 1)
+        while raw and self.line % self.shards != self.shard:
+            self.line += 1
+            offset = self.file.tell()
+            raw = self.file.readline()
+        if not raw:
+            self.on_eof()
+            return
+        self.line += 1
+
+        seq = self.first_seq + len(self.masks)
+        self.offsets.append(offset)
+        self.lines.append(self.line)
+        self.masks.append(0)
+        self.masks[-1] = self._emit(seq, self.line, raw)
+        if not self.masks[-1]:
+            self._advance()
+
+    def _emit(self, seq, line, raw, only=None):
+        """Phát dòng trên các stream (hoặc chỉ stream ``only``); trả về bitmap các stream đã phát"""
+        try:
+            tuples = self.values(line, self._parse(raw))
+        except ValueError as e:
+            self.log(f"Skipping malformed row {line}: {e}")
+            return 0
+
+        mask = 0
+        for i, (stream, values) in enumerate(zip(self.streams, tuples)):
+            if values is None or (only is not None and i != only):
+                continue
+            self.emit(values, tup_id=seq * len(self.streams) + i, stream=stream)
+            mask |= 1 << i
+        return mask
+
+    def _slot(self, tup_id):
+        seq, stream = divmod(int(tup_id), len(self.streams))
+        index = seq - self.first_seq
+        if index < self.head or index >= len(self.masks) or not self.masks[index] & (1 << stream):
+            return None, None, None
+        return seq, index, stream
+
+    def ack(self, tup_id):
+        seq, index, stream = self._slot(tup_id)
+        if seq is None:
+            self.log(f"Ack for unknown tuple ID {tup_id}")
+            return
+        self.failures.pop(tup_id, None)
+        self.masks[index] &= ~(1 << stream)
+        if index == self.head:
+            self._advance()
+
+    def fail(self, tup_id):
+        seq, index, stream = self._slot(tup_id)
+        if seq is None:
+            self.log(f"Fail for unknown tuple ID {tup_id}")
+            return
+        self.failures[tup_id] += 1
+        if self.failures[tup_id] > self.max_fails:
+            self.log(f"Giving up on row {self.lines[index]} (tuple {tup_id}) after {self.max_fails} replays")
+            self.ack(tup_id)
+        else:
+            self.replay.append(tup_id)
+
+    def _replay(self, tup_id):
+        seq, index, stream = self._slot(tup_id)
+        if seq is None:
+            return
+        self.replay_file.seek(self.offsets[index])
+        if not self._emit(seq, self.lines[index], self.replay_file.readline(), only=stream):
+            # Dòng không còn phát được (file bị thay đổi?): bỏ qua để không chặn checkpoint
+            self.ack(tup_id)
+
+    def _advance(self):
+        while self.head < len(self.masks) and not self.masks[self.head]:
+            self.head += 1
+        # Cắt phần đầu đã xong khi nó chiếm quá nửa cửa sổ (tránh dịch mảng sau mỗi ack)
+        if self.head > 1024 and self.head * 2 > len(self.masks):
+            del self.offsets[:self.head], self.lines[:self.head], self.masks[:self.head]
+            self.first_seq += self.head
+            self.head = 0
+
+    def committed(self):
+        """(byte offset, số dòng) mà lần chạy sau sẽ đọc tiếp"""
+        if self.head < len(self.masks):
+            return self.offsets[self.head], self.lines[self.head] - 1
+        return self.file.tell(), self.line
+
+    def _maybe_checkpoint(self, force=False):
+        if not self.checkpoint_path or (not force and time.time() - self.checkpointed_at < self.checkpoint_secs):
+            return
+        self.checkpointed_at = time.time()
+        offset, line = self.committed()
+        if (offset, line) == self.checkpointed:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"source": self.source_path, "offset": offset, "line": line,
+                           "updated": self.checkpointed_at}, f)
+            os.replace(tmp_path, self.checkpoint_path)
+            self.checkpointed = (offset, line)
+        except OSError as e:
+            self.log(f"Lỗi ghi checkpoint: {e}")
+
+    def _restore(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path) as f:
+                state = json.load(f)
+            offset, line = int(state["offset"]), int(state["line"])
+        except (OSError, ValueError, KeyError) as e:
+            self.log(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+            return
+
+        if state.get("source") != self.source_path or not self.data_start <= offset <= os.path.getsize(self.source_path):
+            self.log(f"Checkpoint {self.checkpoint_path} does not match {self.source_path}; starting from the top")
+            return
+        self.file.seek(offset)
+        self.line = line
+        self.checkpointed = (offset, line)
+        self.log(f"Resuming {self.source_path} after row {line} (offset {offset})")
+
+    def cleanup(self):
+        if hasattr(self, 'file') and self.file:
+            self._maybe_checkpoint(force=True)
+            self.file.close()
+        if hasattr(self, 'replay_file') and self.replay_file:
+            self.replay_file.close()
@@ -0,0 +1,25 @@
+from streamparse import Stream
+from common.records import check_header, parse_row
+from common.schemas import ChargesTuple, CustomerTuple, fields
+from spouts.reliable_spout import ReliableCsvSpout
+
+class TelcoSourceSpout(ReliableCsvSpout):
+    # Mỗi dòng chỉ được parse một lần rồi phát lên các stream theo schema của bolt nhận
+    outputs = [
+        Stream(fields=fields(ChargesTuple), name='charges'),
+        Stream(fields=fields(CustomerTuple), name='customer'),
+    ]
+    streams = ['charges', 'customer']
+
+    def initialize(self, stormconf, context):
+        super().initialize(stormconf, context)
+        check_header(self.header)
+
+    def values(self, line, row):
+        record = parse_row(row)
+        return [
+            # (TotalCharges, MonthlyCharges) -> Churn cho bolt dự đoán và bolt ghi processed_churn.csv
+            ChargesTuple((record.TotalCharges, record.MonthlyCharges), record.Churn),
+            # customerID -> các trường còn lại cho bolt lưu trữ, thống kê và tìm kiếm
+            CustomerTuple(record.customerID, list(record[1:])),
+        ]
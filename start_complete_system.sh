@@ -46,8 +46,13 @@ cd ..
 
 sleep 5
 
-# 5. Start real-time data generation
-echo -e "${YELLOW}5. Starting continuous data generation...${NC}"
+# 5. Start chart renderer (matplotlib chạy ngoài Storm worker và Flask)
+echo -e "${YELLOW}5. Starting chart renderer...${NC}"
+python webapp/chart_renderer.py &
+RENDERER_PID=$!
+
+# 6. Start real-time data generation
+echo -e "${YELLOW}6. Starting continuous data generation...${NC}"
 python deploy_storm_with_outputs.py &
 DATA_PID=$!
 
@@ -78,10 +83,10 @@ echo ""
 echo -e "${RED}Press Ctrl+C to stop all services${NC}"
 
 # Wait for user interrupt
-trap 'echo -e "\n${YELLOW}Stopping all services...${NC}"; kill $FLASK_PID $DATA_PID 2>/dev/null; exit 0' INT
+trap 'echo -e "\n${YELLOW}Stopping all services...${NC}"; kill $FLASK_PID $RENDERER_PID $DATA_PID 2>/dev/null; exit 0' INT
 
 # Keep script running
 while true; do
     sleep 10
-    echo -e "${GREEN}🔄 System running... (Flask: $FLASK_PID, Data: $DATA_PID)${NC}"
+    echo -e "${GREEN}🔄 System running... (Flask: $FLASK_PID, Charts: $RENDERER_PID, Data: $DATA_PID)${NC}"
 done 
\ No newline at end of file
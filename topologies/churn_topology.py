@@ -4,34 +4,67 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"
 
 
 from streamparse import Topology
-from spouts.customer_spout import CustomerSpout
+from spouts.telco_source_spout import TelcoSourceSpout
 from bolts.churn_predictor import ChurnPredictorBolt
-from spouts.churn_data_spout import ChurnDataSpout
+from bolts.churn_predictor_full import ChurnPredictorFullBolt
 from bolts.churn_data_bolt import ChurnDataBolt
-from spouts.data_customer_spout import DataCustomerSpout
 from bolts.data_customer_bolt import DataCustomerBolt
-from spouts.data_customer_spout_with_stats import DataCustomerSpoutWithStats
 from bolts.data_customer_bolt_with_stats import DataCustomerBoltWithStats
-from spouts.customer_search_spout import CustomerSearchSpout
 from bolts.customer_search_bolt import CustomerSearchBolt
+from bolts.windowed_churn import WindowedChurnBolt
+from common.topology_config import ComponentConfig
 
-class ChurnPredictionTopology(Topology):
-    customer_spout = CustomerSpout.spec()
-    churn_predictor_bolt = ChurnPredictorBolt.spec(inputs=[customer_spout])
-   
-    churn_spout = ChurnDataSpout.spec()
-    churn_bolt = ChurnDataBolt.spec(inputs=[churn_spout])
-
-    data_customer_spout = DataCustomerSpout.spec()
-    data_customer_bolt = DataCustomerBolt.spec(inputs=[data_customer_spout])
+# Tick mỗi giây để các sink bolt flush buffer khi không có tuple mới
+SINK_CONFIG = {"topology.tick.tuple.freq.secs": 1}
 
-    data_customer_spout_with_stats = DataCustomerSpoutWithStats.spec()
-    data_customer_bolt_with_stats = DataCustomerBoltWithStats.spec(inputs=[data_customer_spout_with_stats])
-
-    customer_search_spout = CustomerSearchSpout.spec()
-    customer_search_bolt = CustomerSearchBolt.spec(inputs=[customer_search_spout])
+# Micro-batch cho các bolt dự đoán
+PREDICTOR_CONFIG = {
+    "churn.predictor.batch_size": 256,
+    "churn.predictor.batch_linger_secs": 0.5,
+    "topology.tick.tuple.freq.secs": 1,
+}
 
+# Cửa sổ trượt/tumbling 1m/5m/1h theo segment; tick mỗi giây để đóng cửa sổ đúng hạn
+WINDOW_CONFIG = {
+    "churn.window.sizes": ["1m", "5m", "1h"],
+    "churn.window.emit_secs": 5,
+    "topology.tick.tuple.freq.secs": 1,
+}
 
+# Parallelism/grouping từng component lấy từ mục "components" của env trong config.json
+COMPONENTS = ComponentConfig.load()
 
+class ChurnPredictionTopology(Topology):
+    # Một spout đọc Telco CSV và fan-out tới tất cả các bolt; với par > 1 mỗi task đọc một phần các dòng
+    telco_source_spout = TelcoSourceSpout.spec(**COMPONENTS.spec("telco_source_spout"))
 
+    # Bolt dự đoán không giữ trạng thái: shuffle
+    churn_predictor_bolt = ChurnPredictorBolt.spec(
+        config=PREDICTOR_CONFIG,
+        **COMPONENTS.spec("churn_predictor_bolt", inputs=[telco_source_spout['charges']]))
+    # Mô hình đầy đủ thuộc tính (Contract, InternetService, tenure, ...) trên stream 'customer';
+    # fields grouping giữ mọi tuple (kể cả replay) của một customerID trên cùng một task
+    churn_predictor_full_bolt = ChurnPredictorFullBolt.spec(
+        config=PREDICTOR_CONFIG,
+        **COMPONENTS.spec("churn_predictor_full_bolt", inputs=[telco_source_spout['customer']],
+                          grouping=["customerID"]))
+    # Tỷ lệ churn dự đoán theo Contract / InternetService / PaymentMethod trên các cửa sổ thời gian;
+    # cửa sổ 'all' cần toàn bộ stream nên dùng global grouping
+    windowed_churn_bolt = WindowedChurnBolt.spec(
+        config=WINDOW_CONFIG,
+        **COMPONENTS.spec("windowed_churn_bolt", inputs=[churn_predictor_full_bolt], grouping="global"))
+    churn_bolt = ChurnDataBolt.spec(
+        config=SINK_CONFIG, **COMPONENTS.spec("churn_bolt", inputs=[telco_source_spout['charges']]))
 
+    data_customer_bolt = DataCustomerBolt.spec(
+        config=SINK_CONFIG,
+        **COMPONENTS.spec("data_customer_bolt", inputs=[telco_source_spout['customer']], grouping=["customerID"]))
+    # Thống kê toàn cục (statistics_summary.csv, snapshot) chỉ có một bản: global grouping
+    data_customer_bolt_with_stats = DataCustomerBoltWithStats.spec(
+        config=SINK_CONFIG,
+        **COMPONENTS.spec("data_customer_bolt_with_stats", inputs=[telco_source_spout['customer']],
+                          grouping="global"))
+    customer_search_bolt = CustomerSearchBolt.spec(
+        config=SINK_CONFIG,
+        **COMPONENTS.spec("customer_search_bolt", inputs=[telco_source_spout['customer']],
+                          grouping=["customerID"]))
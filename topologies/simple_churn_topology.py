@@ -3,9 +3,16 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 
 from streamparse import Topology
+from common.topology_config import ComponentConfig
 from spouts.churn_data_spout import ChurnDataSpout
 from bolts.churn_predictor import ChurnPredictorBolt
 
+COMPONENTS = ComponentConfig.load()
+
 class SimpleChurnTopology(Topology):
-    churn_spout = ChurnDataSpout.spec()
-    churn_predictor_bolt = ChurnPredictorBolt.spec(inputs=[churn_spout]) 
\ No newline at end of file
+    churn_spout = ChurnDataSpout.spec(**COMPONENTS.spec("churn_spout"))
+    churn_predictor_bolt = ChurnPredictorBolt.spec(**COMPONENTS.spec("churn_predictor_bolt", inputs=[churn_spout]), config={
+        "churn.predictor.batch_size": 256,
+        "churn.predictor.batch_linger_secs": 0.5,
+        "topology.tick.tuple.freq.secs": 1,
+    }) 
\ No newline at end of file
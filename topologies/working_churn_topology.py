@@ -3,9 +3,14 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 
 from streamparse import Topology
+from common.topology_config import ComponentConfig
 from spouts.churn_data_spout import ChurnDataSpout
 from bolts.churn_predictor_new import ChurnPredictorNewBolt
 
+COMPONENTS = ComponentConfig.load()
+
 class WorkingChurnTopology(Topology):
-    churn_spout = ChurnDataSpout.spec()
-    churn_predictor_bolt = ChurnPredictorNewBolt.spec(inputs=[churn_spout]) 
\ No newline at end of file
+    churn_spout = ChurnDataSpout.spec(**COMPONENTS.spec("churn_spout"))
+    churn_predictor_bolt = ChurnPredictorNewBolt.spec(**COMPONENTS.spec("churn_predictor_bolt", inputs=[churn_spout]), config={
+        "topology.tick.tuple.freq.secs": 1,
+    }) 
\ No newline at end of file
@@ -5,16 +5,28 @@ Thay thế Streamlit với giao diện đẹp mắt hơn
 """
 import os
 import sys
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file, stream_with_context
 import pandas as pd
 import numpy as np
-import joblib
 import json
+import queue
 from datetime import datetime
 import logging
 
+import batch_input
+import chart_renderer
+from customer_index import CustomerIndex
+from event_broker import EventBroker, format_event
+from tail_reader import CsvTailReader
+
 # Add parent directory to path để import models
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Shared components (common/) used by both the Storm bolts and the web app
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from common.model_registry import ModelRegistry
+from common.prediction_cache import PredictionCache
+from common.stats_store import StatsStore
 
 app = Flask(__name__)
 app.secret_key = 'churn_prediction_secret_key'
@@ -23,56 +35,166 @@ app.secret_key = 'churn_prediction_secret_key'
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Paths to models and data
-MODEL_PATH = "../models/logistic_model_new.pkl"
-PREPROCESSOR_PATH = "../models/preprocessor_new.pkl"
-DATA_DIR = "../data"
+# Paths to models and data: absolute, so the app can be served from any working
+# directory (gunicorn); overridable through the environment
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MODEL_PATH = os.environ.get("CHURN_MODEL_PATH", os.path.join(BASE_DIR, "models", "logistic_model_new.pkl"))
+PREPROCESSOR_PATH = os.environ.get("CHURN_PREPROCESSOR_PATH", os.path.join(BASE_DIR, "models", "preprocessor_new.pkl"))
+DATA_DIR = os.environ.get("CHURN_DATA_DIR", os.path.join(BASE_DIR, "data"))
+
+# Cache of single predictions keyed on rounded charges; size 0 disables it
+PREDICTION_CACHE_SIZE = int(os.environ.get("CHURN_PREDICTION_CACHE_SIZE", 10000))
+PREDICTION_CACHE_TTL = float(os.environ.get("CHURN_PREDICTION_CACHE_TTL", 0)) or None
+# How often to check for a newly deployed model; 0 disables hot reloading
+MODEL_RELOAD_SECS = float(os.environ.get("CHURN_MODEL_RELOAD_SECS", 5))
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet outputs are optional (churn.sink.format = parquet)
+    pq = None
+
+def parquet_parts(filename):
+    """Published Parquet part files written by the bolts in place of `filename`"""
+    directory = os.path.join(DATA_DIR, os.path.splitext(filename)[0])
+    if pq is None or not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.startswith('part-') and name.endswith('.parquet'))
+
+def output_exists(filename):
+    return bool(parquet_parts(filename)) or os.path.exists(os.path.join(DATA_DIR, filename))
+
+def read_output(filename, columns=None):
+    """Read a pipeline output, preferring Parquet part files over the CSV.
+
+    Only `columns` are read from disk when given (column projection).
+    """
+    parts = parquet_parts(filename)
+    if parts:
+        return pd.read_parquet(os.path.dirname(parts[0]), columns=columns)
+    usecols = (lambda column: column in columns) if columns else None
+    return pd.read_csv(os.path.join(DATA_DIR, filename), usecols=usecols)
+
+# Running counters maintained by the prediction bolts
+STATS_DB = os.path.join(DATA_DIR, 'pipeline_stats.db')
+RATE_WINDOWS = {'1m': 60, '5m': 300, '1h': 3600}
+_stats_store = None
+
+def get_stats_store():
+    """Open the bolts' stats store once it exists; None before the topology has run"""
+    global _stats_store
+    if _stats_store is None and os.path.exists(STATS_DB):
+        _stats_store = StatsStore(STATS_DB)
+    return _stats_store
+
+# Number of latest rows shown in the dashboard log output
+TAIL_ROWS = 50
+tail_readers = {
+    filename: CsvTailReader(os.path.join(DATA_DIR, filename), maxlen=TAIL_ROWS)
+    for filename in ('processed_churn.csv', 'predicted_churn.csv')
+}
+
+def count_output_rows(filename):
+    """Row count of a pipeline output; read from Parquet footers when available"""
+    parts = parquet_parts(filename)
+    if parts:
+        return sum(pq.ParquetFile(part).metadata.num_rows for part in parts)
+    if filename in tail_readers:
+        tail_readers[filename].poll()
+        return tail_readers[filename].row_count
+    return len(pd.read_csv(os.path.join(DATA_DIR, filename), usecols=[0]))
+
+def tail_output(filename, n=TAIL_ROWS):
+    """Last `n` rows of a pipeline output and its total row count.
+
+    CSV outputs are served by an incremental CsvTailReader; Parquet outputs
+    read only the trailing row groups.
+    """
+    parts = parquet_parts(filename)
+    if not parts:
+        return tail_readers[filename].tail(n)
+
+    frames, needed = [], n
+    for part in reversed(parts):
+        parquet_file = pq.ParquetFile(part)
+        for group in reversed(range(parquet_file.num_row_groups)):
+            if needed <= 0:
+                break
+            frame = parquet_file.read_row_group(group).to_pandas()
+            frames.insert(0, frame)
+            needed -= len(frame)
+        if needed <= 0:
+            break
+    latest = pd.concat(frames).tail(n) if frames else pd.DataFrame()
+    records = latest.astype(object).where(latest.notna(), None).to_dict('records')
+    return records, count_output_rows(filename)
 
 class ChurnPredictor:
     def __init__(self):
-        self.model = None
-        self.preprocessor = None
+        self.registry = None
+        self.cache = None
+        if PREDICTION_CACHE_SIZE > 0:
+            # Cleared automatically when either model file changes on disk
+            self.cache = PredictionCache([MODEL_PATH, PREPROCESSOR_PATH],
+                                         max_entries=PREDICTION_CACHE_SIZE, ttl_secs=PREDICTION_CACHE_TTL)
         self.load_models()
     
     def load_models(self):
         """Load ML models"""
         try:
-            self.model = joblib.load(MODEL_PATH)
-            self.preprocessor = joblib.load(PREPROCESSOR_PATH)
+            # Preprocessor + model compiled into one vectorized kernel (common/inference.py),
+            # reloaded in the background when a new version is deployed
+            self.registry = ModelRegistry(MODEL_PATH, PREPROCESSOR_PATH, poll_secs=MODEL_RELOAD_SECS, log=logger.info)
             logger.info("✅ ML models loaded successfully")
         except Exception as e:
             logger.error(f"❌ Error loading models: {e}")
-            self.model = None
-            self.preprocessor = None
+            self.registry = None
+    
+    @property
+    def model(self):
+        """Current ModelVersion (version, kernel), or None if loading failed"""
+        return self.registry.current if self.registry else None
+    
+    def predict_many(self, X):
+        """Score an (n, 2) array of (TotalCharges, MonthlyCharges) in one pass.
+
+        Returns (predictions, probabilities, model version); the probability is
+        computed once and thresholded, rather than calling predict and predict_proba.
+        """
+        model = self.model
+        probabilities = model.kernel.predict_proba(X)
+        return (probabilities >= 0.5).astype(np.int64), probabilities, model.version
     
     def predict(self, total_charges, monthly_charges):
         """Make churn prediction"""
-        if not self.model or not self.preprocessor:
-            return None, None, "Models not loaded"
+        model = self.model
+        if not model:
+            return None, None, None, "Models not loaded"
         
         try:
-            # Create input DataFrame
-            input_data = pd.DataFrame([{
-                'TotalCharges': float(total_charges),
-                'MonthlyCharges': float(monthly_charges)
-            }])
-            
-            # Transform data
-            X_processed = self.preprocessor.transform(input_data)
-            
-            # Make prediction
-            prediction = int(self.model.predict(X_processed)[0])
-            probability = float(self.model.predict_proba(X_processed)[0][1])
-            
-            return prediction, probability, "success"
+            X = [[float(total_charges), float(monthly_charges)]]
+            if self.cache:
+                probabilities, _ = self.cache.score(X, model.kernel.predict_proba, model.version)
+            else:
+                probabilities = model.kernel.predict_proba(X)
+            probability = float(probabilities[0])
+            return int(probability >= 0.5), probability, model.version, "success"
             
         except Exception as e:
             logger.error(f"Prediction error: {e}")
-            return None, None, f"Error: {str(e)}"
+            return None, None, None, f"Error: {str(e)}"
 
 # Initialize predictor
 predictor = ChurnPredictor()
 
+# Customer dataset used by search, indexed in memory
+CUSTOMER_FILE = os.path.join(DATA_DIR, 'WA_Fn-UseC_-Telco-Customer-Churn.csv')
+SEARCH_TEXT_COLUMNS = ['customerID', 'gender', 'Partner', 'Dependents', 'PhoneService',
+                       'MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup',
+                       'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies',
+                       'Contract', 'PaperlessBilling', 'PaymentMethod', 'Churn']
+customer_index = CustomerIndex(CUSTOMER_FILE)
+
 @app.route('/')
 def index():
     """Main dashboard page"""
@@ -87,7 +209,7 @@ def predict_churn():
         monthly_charges = data.get('monthly_charges', 0)
         
         # Make prediction
-        prediction, probability, status = predictor.predict(total_charges, monthly_charges)
+        prediction, probability, model_version, status = predictor.predict(total_charges, monthly_charges)
         
         if status != "success":
             return jsonify({
@@ -105,6 +227,7 @@ def predict_churn():
             'probability': round(probability * 100, 2),
             'churn_status': churn_status,
             'confidence': confidence,
+            'model_version': model_version,
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         })
         
@@ -115,21 +238,69 @@ def predict_churn():
             'error': str(e)
         }), 500
 
+@app.route('/api/predict_batch', methods=['POST'])
+def predict_churn_batch():
+    """Score many customers per call.
+
+    Accepts a JSON array (or {"customers": [...]}), an NDJSON body, or a CSV
+    body/upload with TotalCharges and MonthlyCharges columns. Results are
+    streamed back as NDJSON, one line per input row, scored chunk by chunk.
+    """
+    if not predictor.model:
+        return jsonify({
+            'success': False,
+            'error': "Models not loaded"
+        }), 400
+    
+    # Readers are opened inside the response generator: uploads parsed in the
+    # view itself are closed as soon as it returns
+    content_type = request.mimetype
+    if content_type == 'multipart/form-data':
+        read_rows = lambda: batch_input.iter_csv(request.files['file'].stream)
+    elif content_type == 'application/json':
+        read_rows = lambda: batch_input.iter_json(request.stream)
+    elif content_type in ('application/x-ndjson', 'application/jsonl'):
+        read_rows = lambda: batch_input.iter_ndjson(request.stream)
+    elif content_type == 'text/csv':
+        read_rows = lambda: batch_input.iter_csv(request.stream)
+    else:
+        return jsonify({
+            'success': False,
+            'error': f"Unsupported content type: {content_type or 'none'}"
+        }), 415
+    
+    def generate():
+        try:
+            for ids, X, errors in batch_input.chunked(read_rows()):
+                results = [{'index': index, 'error': message} for index, message in errors.items()]
+                if len(X):
+                    predictions, probabilities, model_version = predictor.predict_many(X)
+                    results.extend(
+                        {'index': index, 'customerID': customer_id, 'prediction': int(prediction),
+                         'probability': round(float(probability) * 100, 2), 'model_version': model_version}
+                        for (index, customer_id), prediction, probability in zip(ids, predictions, probabilities)
+                    )
+                results.sort(key=lambda result: result['index'])
+                yield ''.join(json.dumps(result) + '\n' for result in results)
+        except Exception as e:
+            # Headers are already sent; report the failure as the last line
+            logger.error(f"API batch prediction error: {e}")
+            yield json.dumps({'success': False, 'error': str(e)}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/api/data/processed')
 def get_processed_data():
     """Get processed data for log output"""
     try:
-        file_path = os.path.join(DATA_DIR, 'processed_churn.csv')
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path)
-            
-            # Get latest 50 records
-            latest_data = df.tail(50).to_dict('records')
+        if output_exists('processed_churn.csv'):
+            # Get latest 50 records (only newly appended bytes are read)
+            latest_data, total_records = tail_output('processed_churn.csv')
             
             return jsonify({
                 'success': True,
                 'data': latest_data,
-                'total_records': len(df),
+                'total_records': total_records,
                 'last_updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             })
         else:
@@ -149,17 +320,14 @@ def get_processed_data():
 def get_predictions_data():
     """Get predictions data for log output"""
     try:
-        file_path = os.path.join(DATA_DIR, 'predicted_churn.csv')
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path)
-            
-            # Get latest 50 records
-            latest_data = df.tail(50).to_dict('records')
+        if output_exists('predicted_churn.csv'):
+            # Get latest 50 records (only newly appended bytes are read)
+            latest_data, total_records = tail_output('predicted_churn.csv')
             
             return jsonify({
                 'success': True,
                 'data': latest_data,
-                'total_records': len(df),
+                'total_records': total_records,
                 'last_updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             })
         else:
@@ -175,39 +343,69 @@ def get_predictions_data():
             'error': str(e)
         }), 500
 
+def collect_stats():
+    """Current system statistics, shared by /api/stats and the event stream"""
+    stats = {
+        'total_processed': 0,
+        'total_predictions': 0,
+        'churn_rate': 0,
+        'accuracy': 80.0,  # From our model
+        'last_update': 'N/A'
+    }
+    if predictor.model:
+        stats['model_version'] = predictor.model.version
+    if predictor.cache:
+        stats['prediction_cache'] = predictor.cache.stats()
+    
+    store = get_stats_store()
+    if store is not None:
+        # O(1): counters are maintained by the bolts as they process tuples
+        totals = store.totals()
+        stats['total_processed'] = totals.get('processed', 0)
+        stats['total_predictions'] = totals.get('predicted', 0)
+        if stats['total_predictions'] > 0:
+            stats['churn_rate'] = round(totals.get('predicted_churn', 0) / stats['total_predictions'] * 100, 2)
+            stats['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # Per-minute rates over recent windows
+        stats['rates'] = {
+            label: {name: round(count / (secs / 60), 2) for name, count in store.window_totals(secs).items()}
+            for label, secs in RATE_WINDOWS.items()
+        }
+        # Prediction caches of the bolts (churn.cache.enabled)
+        if 'cache_hits' in totals or 'cache_misses' in totals:
+            hits, misses = totals.get('cache_hits', 0), totals.get('cache_misses', 0)
+            stats['pipeline_cache'] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses) * 100, 2) if hits + misses else 0
+            }
+        return stats
+
+    # Count processed records
+    if output_exists('processed_churn.csv'):
+        stats['total_processed'] = count_output_rows('processed_churn.csv')
+    
+    # Count predictions (only the Predicted_Churn column is read)
+    if output_exists('predicted_churn.csv'):
+        df_pred = read_output('predicted_churn.csv', columns=['Predicted_Churn'])
+        stats['total_predictions'] = len(df_pred)
+        
+        # Calculate churn rate if data exists
+        if len(df_pred) > 0:
+            churn_count = df_pred['Predicted_Churn'].sum() if 'Predicted_Churn' in df_pred.columns else 0
+            stats['churn_rate'] = round(float(churn_count / len(df_pred)) * 100, 2)
+            stats['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    return stats
+
 @app.route('/api/stats')
 def get_statistics():
     """Get system statistics"""
     try:
-        stats = {
-            'total_processed': 0,
-            'total_predictions': 0,
-            'churn_rate': 0,
-            'accuracy': 80.0,  # From our model
-            'last_update': 'N/A'
-        }
-        
-        # Count processed records
-        processed_file = os.path.join(DATA_DIR, 'processed_churn.csv')
-        if os.path.exists(processed_file):
-            df_processed = pd.read_csv(processed_file)
-            stats['total_processed'] = len(df_processed)
-        
-        # Count predictions
-        predictions_file = os.path.join(DATA_DIR, 'predicted_churn.csv')
-        if os.path.exists(predictions_file):
-            df_pred = pd.read_csv(predictions_file)
-            stats['total_predictions'] = len(df_pred)
-            
-            # Calculate churn rate if data exists
-            if len(df_pred) > 0:
-                churn_count = df_pred['Predicted_Churn'].sum() if 'Predicted_Churn' in df_pred.columns else 0
-                stats['churn_rate'] = round((churn_count / len(df_pred)) * 100, 2)
-                stats['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
         return jsonify({
             'success': True,
-            'stats': stats
+            'stats': collect_stats()
         })
         
     except Exception as e:
@@ -217,13 +415,68 @@ def get_statistics():
             'error': str(e)
         }), 500
 
+# Event name sent to the dashboard -> pipeline output file
+STREAM_OUTPUTS = {
+    'processed': 'processed_churn.csv',
+    'predictions': 'predicted_churn.csv'
+}
+_stream_state = {'counts': {}, 'stats': None}
+
+def produce_dashboard_events():
+    """Poll the outputs once and yield (event, data) for whatever changed.
+
+    Runs only on the broker's single producer thread.
+    """
+    for event, filename in STREAM_OUTPUTS.items():
+        if not output_exists(filename):
+            continue
+        total_records = count_output_rows(filename)
+        last_count = _stream_state['counts'].get(filename)
+        if total_records == last_count:
+            continue
+        
+        # Send only the new rows; a shrunken or first-seen file resets the client's table
+        reset = last_count is None or total_records < last_count
+        new_rows = TAIL_ROWS if reset else min(total_records - last_count, TAIL_ROWS)
+        rows, _ = tail_output(filename, new_rows)
+        _stream_state['counts'][filename] = total_records
+        yield event, {'data': rows, 'total_records': total_records, 'reset': reset}
+    
+    stats = collect_stats()
+    comparable = {key: value for key, value in stats.items() if key != 'last_update'}
+    if comparable != _stream_state['stats']:
+        _stream_state['stats'] = comparable
+        yield 'stats', stats
+
+event_broker = EventBroker(produce_dashboard_events, poll_secs=1.0)
+
+@app.route('/api/stream')
+def stream_events():
+    """Server-Sent Events: new processed rows, predictions and stats as they appear"""
+    def generate():
+        subscriber = event_broker.subscribe()
+        try:
+            # Current stats right away; rows arrive as the bolts append them
+            yield format_event('stats', collect_stats())
+            while subscriber in event_broker.subscribers:
+                try:
+                    yield subscriber.get(timeout=15)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+        finally:
+            event_broker.unsubscribe(subscriber)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/statistics')
 def get_statistics_data():
     """Get statistics summary data"""
     try:
         stats_file = os.path.join(DATA_DIR, 'statistics_summary.csv')
         if os.path.exists(stats_file):
-            df = pd.read_csv(stats_file)
+            # Hàng count/unique/top/freq như describe(include='all'); ô trống (NaN) với cột số
+            df = pd.read_csv(stats_file, index_col=0).astype(object).where(lambda d: d.notna(), '')
             
             # Convert DataFrame to a more readable format
             stats_data = []
@@ -263,22 +516,21 @@ def search_customers():
         search_field = data.get('field', 'all')
         limit = int(data.get('limit', 50))
         
-        # Load customer data
-        customer_file = os.path.join(DATA_DIR, 'WA_Fn-UseC_-Telco-Customer-Churn.csv')
-        if not os.path.exists(customer_file):
+        # Load customer data (parsed and indexed once, reloaded when the file changes)
+        if not os.path.exists(CUSTOMER_FILE):
             return jsonify({
                 'success': False,
                 'error': 'Customer data file not found'
             }), 404
         
-        df = pd.read_csv(customer_file)
+        index = customer_index.snapshot()
+        df = index.df
         
         # Filter data based on search query
         if search_query and search_field != 'all':
             if search_field in df.columns:
                 # Search in specific field
-                mask = df[search_field].astype(str).str.lower().str.contains(search_query, na=False)
-                filtered_df = df[mask]
+                filtered_df = df.iloc[index.search(search_query, [search_field])]
             else:
                 return jsonify({
                     'success': False,
@@ -286,17 +538,7 @@ def search_customers():
                 }), 400
         elif search_query:
             # Search in all text fields
-            text_columns = ['customerID', 'gender', 'Partner', 'Dependents', 'PhoneService', 
-                          'MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup',
-                          'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies',
-                          'Contract', 'PaperlessBilling', 'PaymentMethod', 'Churn']
-            
-            mask = pd.Series([False] * len(df))
-            for col in text_columns:
-                if col in df.columns:
-                    mask |= df[col].astype(str).str.lower().str.contains(search_query, na=False)
-            
-            filtered_df = df[mask]
+            filtered_df = df.iloc[index.search(search_query, SEARCH_TEXT_COLUMNS)]
         else:
             # No search query, return recent records
             filtered_df = df.tail(limit)
@@ -362,24 +604,22 @@ def get_available_charts():
     """Get list of available chart images"""
     try:
         charts = []
-        chart_files = {
-            'customer_distribution_by_totalcharges.png': 'Customer Distribution by Total Charges',
-            'average_charges_by_churn.png': 'Average Charges by Churn Status',
-            'churned_customers_piechart.png': 'Churned Customers Distribution'
-        }
+        # Bộ PNG mới nhất của chart_renderer; nếu renderer chưa chạy thì dùng file PNG cũ trong data/
+        version, chart_dir = chart_renderer.current_charts(DATA_DIR)
         
-        for filename, title in chart_files.items():
-            file_path = os.path.join(DATA_DIR, filename)
+        for filename, title in chart_renderer.CHART_TITLES.items():
+            file_path = os.path.join(chart_dir or DATA_DIR, filename)
             if os.path.exists(file_path):
                 charts.append({
                     'filename': filename,
                     'title': title,
-                    'url': f'/api/chart/{filename}'
+                    'url': f'/api/chart/{filename}' + (f'?v={version}' if version else '')
                 })
         
         return jsonify({
             'success': True,
-            'charts': charts
+            'charts': charts,
+            'version': version
         })
         
     except Exception as e:
@@ -394,18 +634,15 @@ def serve_chart(filename):
     """Serve chart images"""
     try:
         # Security check: only allow specific chart files
-        allowed_files = [
-            'customer_distribution_by_totalcharges.png',
-            'average_charges_by_churn.png', 
-            'churned_customers_piechart.png'
-        ]
-        
-        if filename not in allowed_files:
+        if filename not in chart_renderer.CHART_TITLES:
             return jsonify({'error': 'Chart not found'}), 404
             
-        file_path = os.path.join(DATA_DIR, filename)
+        version, chart_dir = chart_renderer.current_charts(DATA_DIR)
+        file_path = os.path.join(chart_dir, filename) if chart_dir else os.path.join(DATA_DIR, filename)
         if os.path.exists(file_path):
-            return send_file(file_path, mimetype='image/png')
+            # ETag = version của snapshot: trình duyệt revalidate và nhận 304 khi biểu đồ chưa đổi
+            return send_file(file_path, mimetype='image/png', conditional=True, max_age=0,
+                             etag=f"{version}-{filename}" if version else True)
         else:
             return jsonify({'error': 'Chart file not found'}), 404
             
@@ -421,80 +658,20 @@ def filter_customers():
         filters = data.get('filters', {})
         limit = int(data.get('limit', 100))
         
-        # Load customer data
-        customer_file = os.path.join(DATA_DIR, 'WA_Fn-UseC_-Telco-Customer-Churn.csv')
-        if not os.path.exists(customer_file):
+        # Load customer data (pre-typed once per file version)
+        if not os.path.exists(CUSTOMER_FILE):
             return jsonify({
                 'success': False,
                 'error': 'Customer data file not found'
             }), 404
         
-        df = pd.read_csv(customer_file)
-        
-        # Apply filters
-        filtered_df = df.copy()
-        
-        # Gender filter
-        if filters.get('gender'):
-            filtered_df = filtered_df[filtered_df['gender'] == filters['gender']]
-            
-        # Senior Citizen filter
-        if filters.get('senior_citizen') is not None:
-            filtered_df = filtered_df[filtered_df['SeniorCitizen'] == int(filters['senior_citizen'])]
-            
-        # Contract filter
-        if filters.get('contract'):
-            filtered_df = filtered_df[filtered_df['Contract'] == filters['contract']]
-            
-        # Internet Service filter
-        if filters.get('internet_service'):
-            filtered_df = filtered_df[filtered_df['InternetService'] == filters['internet_service']]
-            
-        # Churn filter
-        if filters.get('churn'):
-            filtered_df = filtered_df[filtered_df['Churn'] == filters['churn']]
-            
-        # Monthly Charges range filter
-        if filters.get('monthly_charges_min') is not None:
-            filtered_df = filtered_df[filtered_df['MonthlyCharges'] >= float(filters['monthly_charges_min'])]
-        if filters.get('monthly_charges_max') is not None:
-            filtered_df = filtered_df[filtered_df['MonthlyCharges'] <= float(filters['monthly_charges_max'])]
-            
-        # Total Charges range filter  
-        if filters.get('total_charges_min') is not None:
-            # Convert TotalCharges to numeric, handle non-numeric values
-            filtered_df['TotalCharges'] = pd.to_numeric(filtered_df['TotalCharges'], errors='coerce')
-            filtered_df = filtered_df[filtered_df['TotalCharges'] >= float(filters['total_charges_min'])]
-        if filters.get('total_charges_max') is not None:
-            filtered_df['TotalCharges'] = pd.to_numeric(filtered_df['TotalCharges'], errors='coerce')
-            filtered_df = filtered_df[filtered_df['TotalCharges'] <= float(filters['total_charges_max'])]
-            
-        # Tenure range filter
-        if filters.get('tenure_min') is not None:
-            filtered_df = filtered_df[filtered_df['tenure'] >= int(filters['tenure_min'])]
-        if filters.get('tenure_max') is not None:
-            filtered_df = filtered_df[filtered_df['tenure'] <= int(filters['tenure_max'])]
-        
-        # Remove rows with NaN values
-        filtered_df = filtered_df.dropna()
-        
-        # Limit results
-        result_df = filtered_df.head(limit)
+        # Build one combined mask and the summary statistics in a single pass
+        result_data, summary = customer_index.snapshot().filters.apply(filters, limit)
         
         # Add filter metadata
-        result_data = result_df.to_dict('records')
         for record in result_data:
             record['filter_timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        # Calculate summary statistics
-        summary = {
-            'total_found': len(filtered_df),
-            'showing': len(result_data),
-            'churn_rate': round((filtered_df['Churn'] == 'Yes').sum() / len(filtered_df) * 100, 2) if len(filtered_df) > 0 else 0,
-            'avg_monthly_charges': round(filtered_df['MonthlyCharges'].mean(), 2) if len(filtered_df) > 0 else 0,
-            'avg_total_charges': round(pd.to_numeric(filtered_df['TotalCharges'], errors='coerce').mean(), 2) if len(filtered_df) > 0 else 0
-        }
-        
         return jsonify({
             'success': True,
             'data': result_data,
@@ -544,4 +721,5 @@ if __name__ == '__main__':
     print("📊 Dashboard: http://localhost:5001")
     print("🔧 Models loaded:", "✅" if predictor.model else "❌")
     
+    # Development server only; production runs gunicorn (see gunicorn.conf.py)
     app.run(debug=True, host='0.0.0.0', port=5001) 
\ No newline at end of file
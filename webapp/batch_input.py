@@ -0,0 +1,212 @@
+"""
+Row readers for /api/predict_batch.
+
+A batch arrives as a JSON array, an NDJSON body or a CSV file (raw body or
+multipart upload). Each reader yields one row at a time from the request
+stream (a JSON array is decoded element by element, not loaded whole), and
+`chunked` groups them into fixed-size float64 matrices, so the endpoint
+scores and streams results chunk by chunk and memory stays bounded by the
+chunk size rather than the upload size.
+"""
+import codecs
+import csv
+import json
+import math
+
+import numpy as np
+
+CHUNK_ROWS = 5000
+READ_SIZE = 1 << 16
+# Longest JSON array element accepted by iter_json
+MAX_ROW_CHARS = 1 << 20
+
+# Accepted spellings of each field, in lookup order
+TOTAL_CHARGES_KEYS = ('total_charges', 'TotalCharges')
+MONTHLY_CHARGES_KEYS = ('monthly_charges', 'MonthlyCharges')
+ID_KEYS = ('customerID', 'customer_id', 'id')
+
+
+def _lookup(row, keys):
+    for key in keys:
+        if key in row:
+            return row[key]
+    raise ValueError(f"Missing {keys[0]}")
+
+
+def _charge(value, name):
+    # TotalCharges is blank for new customers in the Telco file
+    if isinstance(value, str) and not value.strip():
+        return 0.0
+    if isinstance(value, bool) or value is None:
+        raise ValueError(f"Invalid {name}: {value!r}")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name}: {value!r}")
+    if not math.isfinite(value):
+        raise ValueError(f"Invalid {name}: {value!r}")
+    return value
+
+
+def parse_row(row):
+    """(customer id or None, total_charges, monthly_charges) from a dict or [total, monthly] pair.
+
+    Blank charges count as 0.0; a missing or non-numeric charge raises ValueError.
+    """
+    if isinstance(row, dict):
+        customer_id = next((row[key] for key in ID_KEYS if key in row), None)
+        return customer_id, _charge(_lookup(row, TOTAL_CHARGES_KEYS), 'total_charges'), \
+            _charge(_lookup(row, MONTHLY_CHARGES_KEYS), 'monthly_charges')
+    if isinstance(row, (list, tuple)) and len(row) == 2:
+        return None, _charge(row[0], 'total_charges'), _charge(row[1], 'monthly_charges')
+    raise ValueError("Expected an object or a [total_charges, monthly_charges] pair")
+
+
+class _JsonArrayReader:
+    """Decodes the elements of a JSON array one at a time from a binary stream"""
+
+    def __init__(self, stream, encoding='utf-8'):
+        self.stream = stream
+        self.text = codecs.getincrementaldecoder(encoding)()
+        self.json = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        # Drop the consumed text, then append the next block
+        block = self.stream.read(READ_SIZE)
+        self.eof = not block
+        self.buffer = self.buffer[self.pos:] + self.text.decode(block, final=self.eof)
+        self.pos = 0
+
+    def _peek(self):
+        """Next non-whitespace character without consuming it; '' at the end of the stream"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._fill()
+
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(f"Invalid JSON: expected {' or '.join(chars)}, got {char or 'end of input'!r}")
+        self.pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.json.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may continue in the next block
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            if len(self.buffer) - self.pos > MAX_ROW_CHARS:
+                raise ValueError(f"JSON value longer than {MAX_ROW_CHARS} characters")
+            self._fill()
+
+    def _find_customers(self):
+        """Consume an object up to the value of its "customers" key; False if it has none"""
+        self._expect('{')
+        if self._peek() == '}':
+            return False
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == 'customers':
+                return True
+            self._value()
+            if self._expect(',}') == '}':
+                return False
+
+    def rows(self):
+        if self._peek() == '{' and not self._find_customers():
+            raise ValueError("Expected a JSON array of customers")
+        if self._peek() != '[':
+            raise ValueError("Expected a JSON array of customers")
+        self.pos += 1
+        if self._peek() == ']':
+            return
+        while True:
+            yield self._value()
+            if self._expect(',]') == ']':
+                return
+
+
+def iter_json(stream, encoding='utf-8'):
+    """Rows of a JSON array, or of {"customers": [...]}, decoded incrementally.
+
+    Only the element being decoded is buffered, so a single row may be at most
+    MAX_ROW_CHARS characters; other keys of the wrapping object are skipped.
+    """
+    return _JsonArrayReader(stream, encoding).rows()
+
+
+def iter_lines(stream, encoding='utf-8'):
+    """Decoded lines (with their line endings) of a binary stream, read in fixed-size blocks.
+
+    Only needs `read()`, which every WSGI server's input stream provides.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    partial = ''
+    while True:
+        block = stream.read(READ_SIZE)
+        text = decoder.decode(block, final=not block)
+        lines = (partial + text).splitlines(keepends=True)
+        # The last line may be incomplete until the next block arrives
+        partial = lines.pop() if lines and block and not lines[-1].endswith('\n') else ''
+        yield from lines
+        if not block:
+            break
+
+
+def iter_ndjson(stream, encoding='utf-8'):
+    """Rows of a newline-delimited JSON stream; undecodable lines are yielded as errors"""
+    for line in iter_lines(stream, encoding):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+def iter_csv(stream, encoding='utf-8'):
+    """Rows of a CSV stream with a header line"""
+    return csv.DictReader(iter_lines(stream, encoding))
+
+
+def chunked(rows, size=CHUNK_ROWS):
+    """Group rows into (ids, X, errors) chunks of at most `size` input rows.
+
+    `ids` holds (row index, customer id) for each valid row, X is the matching
+    (n, 2) float64 array and `errors` maps the index of each rejected row to
+    its message.
+    """
+    count = 0
+    ids, features, errors = [], [], {}
+    for index, row in enumerate(rows):
+        try:
+            if isinstance(row, Exception):
+                raise row
+            customer_id, total_charges, monthly_charges = parse_row(row)
+            ids.append((index, customer_id))
+            features.append((total_charges, monthly_charges))
+        except (TypeError, ValueError) as e:
+            errors[index] = str(e)
+
+        count += 1
+        if count == size:
+            yield ids, np.array(features, dtype=np.float64).reshape(-1, 2), errors
+            count = 0
+            ids, features, errors = [], [], {}
+
+    if ids or errors:
+        yield ids, np.array(features, dtype=np.float64).reshape(-1, 2), errors
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""
+Vẽ biểu đồ thống kê trong một process riêng, ngoài Storm worker và web app.
+
+    python webapp/chart_renderer.py               # kiểm tra snapshot mỗi 10 giây
+    python webapp/chart_renderer.py --interval 30
+    python webapp/chart_renderer.py --once
+
+Đọc data/statistics_snapshot.json do DataCustomerBoltWithStats ghi trên tick
+và chỉ vẽ lại khi version của snapshot thay đổi. PNG của mỗi version nằm trong
+data/charts/<version>/; data/charts/current.json trỏ tới version mới nhất và
+được /api/chart/<filename> dùng làm ETag.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.environ.get("CHURN_DATA_DIR", os.path.join(BASE_DIR, "data"))
+SNAPSHOT_FILE = "statistics_snapshot.json"
+
+CHART_TITLES = {
+    'customer_distribution_by_totalcharges.png': 'Customer Distribution by Total Charges',
+    'average_charges_by_churn.png': 'Average Charges by Churn Status',
+    'churned_customers_piechart.png': 'Churned Customers Distribution',
+}
+
+
+def charts_root(data_dir):
+    return os.path.join(data_dir, "charts")
+
+
+def current_charts(data_dir):
+    """(version, directory) của bộ biểu đồ mới nhất, hoặc (None, None) nếu renderer chưa chạy"""
+    try:
+        with open(os.path.join(charts_root(data_dir), "current.json")) as f:
+            version = json.load(f)["version"]
+    except (OSError, ValueError, KeyError):
+        return None, None
+    return version, os.path.join(charts_root(data_dir), version)
+
+
+def render(snapshot, output_dir):
+    """Vẽ ba biểu đồ từ snapshot vào output_dir"""
+    # Chỉ renderer import matplotlib; backend Agg không cần màn hình
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    # Biểu đồ pie cho khách hàng rời đi
+    churned_count = snapshot["churn_counts"].get("Yes", 0)
+    not_churned_count = snapshot["rows"] - churned_count
+
+    labels = ['Khách hàng rời đi', 'Khách hàng không rời đi']
+    sizes = [churned_count, not_churned_count]
+    explode = (0.1, 0)
+
+    plt.figure(figsize=(7, 7))
+    plt.pie(sizes, explode=explode, labels=labels, autopct='%1.1f%%', shadow=True, startangle=140)
+    plt.title("Tỷ lệ khách hàng rời đi vs không rời đi")
+    plt.axis('equal')
+    plt.savefig(os.path.join(output_dir, "churned_customers_piechart.png"))
+    plt.close()
+
+    # Vẽ biểu đồ cho trung bình TotalCharges và MonthlyCharges theo Churn
+    churn_values = list(snapshot["group_means"])
+    positions = range(len(churn_values))
+    plt.figure(figsize=(10, 6))
+    plt.bar([p - 0.2 for p in positions], [snapshot["group_means"][c]["TotalCharges"] for c in churn_values],
+            width=0.4, color="orange")
+    plt.bar([p + 0.2 for p in positions], [snapshot["group_means"][c]["MonthlyCharges"] for c in churn_values],
+            width=0.4, color="yellow")
+    plt.xticks(list(positions), churn_values)
+    plt.title("Trung bình TotalCharges và MonthlyCharges theo Churn")
+    plt.ylabel("Giá trị trung bình ($)")
+    plt.xlabel("Churn (0: Không, 1: Có)")
+    plt.legend(["TotalCharges", "MonthlyCharges"])
+    plt.savefig(os.path.join(output_dir, "average_charges_by_churn.png"))
+    plt.close()
+
+    # Vẽ biểu đồ phân phối khách hàng theo TotalCharges (có phân loại Churn), từ histogram cố định
+    histogram = snapshot["histogram"]
+    edges = histogram["edges"]
+    bottom = [0] * (len(edges) - 1)
+    plt.figure(figsize=(12, 7))
+    for churn, counts in histogram["counts"].items():
+        plt.bar(edges[:-1], counts, width=edges[1] - edges[0], bottom=bottom, align="edge",
+                label="Rời đi" if churn == "Yes" else "Không rời đi")
+        bottom = [b + c for b, c in zip(bottom, counts)]
+    plt.title("Phân phối khách hàng theo TotalCharges (có phân loại Churn)")
+    plt.xlabel("TotalCharges ($)")
+    plt.ylabel("Số lượng khách hàng")
+    plt.legend(title="Churn")
+    plt.savefig(os.path.join(output_dir, "customer_distribution_by_totalcharges.png"))
+    plt.close()
+
+
+def render_snapshot(data_dir, keep=2):
+    """Vẽ snapshot hiện tại nếu version của nó chưa có trong cache; trả về version"""
+    with open(os.path.join(data_dir, SNAPSHOT_FILE)) as f:
+        snapshot = json.load(f)
+    version = str(snapshot["version"])
+    root = charts_root(data_dir)
+    output_dir = os.path.join(root, version)
+
+    if not os.path.isdir(output_dir):
+        # Vẽ vào thư mục tạm rồi đổi tên: web app không bao giờ thấy bộ PNG dở dang
+        tmp_dir = f"{output_dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        render(snapshot, tmp_dir)
+        os.replace(tmp_dir, output_dir)
+        logger.info(f"Rendered charts for snapshot {version}")
+
+    if current_charts(data_dir)[0] != version:
+        tmp_path = os.path.join(root, "current.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": version, "rendered_at": time.time()}, f)
+        os.replace(tmp_path, os.path.join(root, "current.json"))
+
+    # Giữ vài version gần nhất cho những request đang đọc version cũ
+    versions = sorted((entry for entry in os.scandir(root) if entry.is_dir() and not entry.name.endswith(".tmp")),
+                      key=lambda entry: entry.stat().st_mtime)
+    for entry in versions[:-keep]:
+        if entry.name != version:
+            shutil.rmtree(entry.path, ignore_errors=True)
+    return version
+
+
+def run(data_dir, interval):
+    while True:
+        try:
+            if os.path.exists(os.path.join(data_dir, SNAPSHOT_FILE)):
+                render_snapshot(data_dir)
+        except Exception as e:
+            logger.error(f"Error rendering charts: {e}")
+        time.sleep(interval)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render the statistics charts from the streaming snapshot")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--interval", type=float, default=10.0, help="Seconds between snapshot checks")
+    parser.add_argument("--once", action="store_true", help="Render the current snapshot and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    if args.once:
+        print(render_snapshot(args.data_dir))
+    else:
+        run(args.data_dir, args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Vectorized filter engine for /api/filter_customers.
+
+Columns are typed once per dataset version: categoricals are dictionary
+encoded to small integer codes and charges/tenure are stored as float64
+arrays. A request's filter JSON is compiled into a list of predicates that
+are AND-ed in place into a single boolean mask, and the summary statistics
+are computed from that mask directly, without intermediate DataFrames.
+"""
+import numpy as np
+import pandas as pd
+
+# Filter JSON key -> (column, kind)
+FILTERS = {
+    'gender': ('gender', 'category'),
+    'contract': ('Contract', 'category'),
+    'internet_service': ('InternetService', 'category'),
+    'churn': ('Churn', 'category'),
+    'senior_citizen': ('SeniorCitizen', 'equal'),
+    'monthly_charges_min': ('MonthlyCharges', 'min'),
+    'monthly_charges_max': ('MonthlyCharges', 'max'),
+    'total_charges_min': ('TotalCharges', 'min'),
+    'total_charges_max': ('TotalCharges', 'max'),
+    'tenure_min': ('tenure', 'min'),
+    'tenure_max': ('tenure', 'max'),
+}
+
+CATEGORY_COLUMNS = ['gender', 'Contract', 'InternetService', 'Churn']
+NUMERIC_COLUMNS = ['SeniorCitizen', 'MonthlyCharges', 'TotalCharges', 'tenure']
+
+# Code for a value missing from a column's categories; pd.Categorical uses -1 for NaN
+UNKNOWN_CODE = -2
+
+
+class CustomerFilter:
+    """Pre-typed, dictionary-encoded view of the customer dataset"""
+
+    def __init__(self, df):
+        # TotalCharges is blank for new customers; parse it once here
+        self.records = df.assign(TotalCharges=pd.to_numeric(df['TotalCharges'], errors='coerce'))
+        self.size = len(df)
+
+        self.codes = {}
+        self.categories = {}
+        for column in CATEGORY_COLUMNS:
+            categorical = pd.Categorical(df[column])
+            self.codes[column] = categorical.codes
+            self.categories[column] = {value: code for code, value in enumerate(categorical.categories)}
+
+        self.numeric = {column: self.records[column].to_numpy(dtype=np.float64) for column in NUMERIC_COLUMNS}
+        self.churn_yes = self.codes['Churn'] == self.categories['Churn'].get('Yes', UNKNOWN_CODE)
+
+    def compile(self, filters):
+        """Turn filter JSON into (kind, column, value) predicates, skipping empty values"""
+        predicates = []
+        for key, (column, kind) in FILTERS.items():
+            value = filters.get(key)
+            if value is None or value == '':
+                continue
+            if kind == 'category':
+                predicates.append((kind, column, self.categories[column].get(value, UNKNOWN_CODE)))
+            else:
+                predicates.append((kind, column, float(value)))
+        return predicates
+
+    def mask(self, predicates):
+        """AND all predicates into one boolean mask"""
+        mask = np.ones(self.size, dtype=bool)
+        for kind, column, value in predicates:
+            if kind == 'category':
+                mask &= self.codes[column] == value
+            elif kind == 'equal':
+                mask &= self.numeric[column] == value
+            elif kind == 'min':
+                mask &= self.numeric[column] >= value
+            else:
+                mask &= self.numeric[column] <= value
+        return mask
+
+    def apply(self, filters, limit):
+        """Return (records, summary) for the first `limit` matching rows"""
+        mask = self.mask(self.compile(filters))
+
+        found = int(np.count_nonzero(mask))
+        total_charges = self.numeric['TotalCharges']
+        total_valid = mask & ~np.isnan(total_charges)
+        total_count = int(np.count_nonzero(total_valid))
+
+        rows = np.flatnonzero(mask)[:limit]
+        result = self.records.iloc[rows]
+        records = result.astype(object).where(result.notna(), None).to_dict('records')
+
+        summary = {
+            'total_found': found,
+            'showing': len(records),
+            'churn_rate': round(np.count_nonzero(mask & self.churn_yes) / found * 100, 2) if found > 0 else 0,
+            'avg_monthly_charges': round(float(self.numeric['MonthlyCharges'].sum(where=mask)) / found, 2) if found > 0 else 0,
+            'avg_total_charges': round(float(total_charges.sum(where=total_valid)) / total_count, 2) if total_count > 0 else 0
+        }
+        return records, summary
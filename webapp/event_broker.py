@@ -0,0 +1,70 @@
+"""
+Server-Sent Events fan-out for the dashboard.
+
+One background thread polls the pipeline outputs through a `produce` callback
+and publishes whatever changed. Each event is serialized once and pushed onto
+the queue of every connected client, so N open dashboards cost the same file
+and stats reads as one.
+"""
+import json
+import queue
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(name, data):
+    """Encode one SSE message"""
+    return f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class EventBroker:
+    """Runs a single producer thread and fans its events out to subscriber queues"""
+
+    def __init__(self, produce, poll_secs=1.0, max_queued=100):
+        self.produce = produce
+        self.poll_secs = poll_secs
+        self.max_queued = max_queued
+        self.subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self):
+        """Register a client; starts the producer thread on first use"""
+        subscriber = queue.Queue(maxsize=self.max_queued)
+        with self._lock:
+            self.subscribers.add(subscriber)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='sse-producer', daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, name, data):
+        message = format_event(name, data)
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # A client that stopped reading must not stall the others
+                self.unsubscribe(subscriber)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self.subscribers:
+                    self._thread = None
+                    return
+            try:
+                for name, data in self.produce():
+                    self.publish(name, data)
+            except Exception as e:
+                logger.error(f"Event producer error: {e}")
+            time.sleep(self.poll_secs)
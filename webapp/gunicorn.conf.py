@@ -0,0 +1,31 @@
+"""
+gunicorn settings for the churn web app.
+
+    gunicorn -c webapp/gunicorn.conf.py
+
+Environment:
+    CHURN_WEB_BIND      address to listen on (default 0.0.0.0:5001)
+    CHURN_WEB_WORKERS   worker processes (default: number of CPUs)
+    CHURN_WEB_THREADS   threads per worker (default 4)
+    CHURN_WEB_TIMEOUT   worker timeout in seconds (default 60)
+
+Model and data locations are read by app.py from CHURN_MODEL_PATH,
+CHURN_PREPROCESSOR_PATH and CHURN_DATA_DIR.
+"""
+import multiprocessing
+import os
+
+pythonpath = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = "wsgi:application"
+
+bind = os.environ.get("CHURN_WEB_BIND", "0.0.0.0:5001")
+workers = int(os.environ.get("CHURN_WEB_WORKERS", multiprocessing.cpu_count()))
+# Threaded workers: /api/stream keeps one connection open per dashboard
+worker_class = "gthread"
+threads = int(os.environ.get("CHURN_WEB_THREADS", 4))
+timeout = int(os.environ.get("CHURN_WEB_TIMEOUT", 60))
+
+# Load the app (model, customer index) once in the master, then fork
+preload_app = True
+
+accesslog = "-"
@@ -0,0 +1,98 @@
+"""
+Incremental tail reader for the append-only CSV outputs written by the bolts.
+
+Each reader remembers the byte offset and row count it has seen so far. A poll
+only reads the bytes appended since the previous poll and pushes the complete
+lines into a ring buffer holding the last `maxlen` rows, so serving the
+dashboard's "latest N rows" costs O(new rows) instead of O(file size). If the
+file shrinks or is replaced, the reader starts over from the beginning.
+"""
+import csv
+import os
+import threading
+from collections import deque
+
+CHUNK_SIZE = 1 << 20
+
+
+def _convert(value):
+    """Best-effort typing matching what pandas.read_csv would return"""
+    if value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+class CsvTailReader:
+    """Tracks one CSV file and keeps its last `maxlen` rows in memory"""
+
+    def __init__(self, path, maxlen=50, encoding='utf-8'):
+        self.path = path
+        self.maxlen = maxlen
+        self.encoding = encoding
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, inode):
+        self.inode = inode
+        self.offset = 0
+        self.row_count = 0
+        self.header = None
+        self.partial = b''
+        self.lines = deque(maxlen=self.maxlen)
+
+    def poll(self):
+        """Read bytes appended since the last poll; returns the number of new rows"""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset(None)
+                return 0
+
+            if stat.st_ino != self.inode or stat.st_size < self.offset:
+                self._reset(stat.st_ino)
+            if stat.st_size == self.offset:
+                return 0
+
+            new_rows = 0
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    self.offset += len(chunk)
+                    lines = (self.partial + chunk).split(b'\n')
+                    # The last piece has no newline yet; keep it for the next poll
+                    self.partial = lines.pop()
+                    # csv.writer terminates rows with \r\n
+                    lines = [line.rstrip(b'\r') for line in lines if line.strip()]
+                    if self.header is None and lines:
+                        self.header = next(csv.reader([lines.pop(0).decode(self.encoding)]))
+                    self.lines.extend(lines)
+                    new_rows += len(lines)
+
+            self.row_count += new_rows
+            return new_rows
+
+    def tail(self, n=None):
+        """Return (last n rows as dicts, total row count) after polling for new data"""
+        self.poll()
+        with self._lock:
+            lines = list(self.lines)
+            header = self.header
+            row_count = self.row_count
+        if n is not None:
+            lines = lines[-n:] if n > 0 else []
+        if header is None:
+            return [], row_count
+
+        rows = csv.reader(line.decode(self.encoding) for line in lines)
+        return [dict(zip(header, map(_convert, row))) for row in rows], row_count
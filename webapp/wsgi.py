@@ -0,0 +1,35 @@
+"""
+WSGI entry point for production serving.
+
+    gunicorn -c webapp/gunicorn.conf.py
+
+gunicorn.conf.py sets preload_app, so this module is imported once in the
+master process: the model, the customer index and the filter arrays are loaded
+here before the workers fork, and every worker shares those pages
+copy-on-write instead of holding its own copy.
+"""
+import gc
+import os
+import sys
+
+# The web app modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, customer_index, logger, predictor
+
+# Build the search/filter index now rather than on the first request in each worker
+try:
+    customer_index.snapshot()
+except Exception as e:
+    logger.error(f"Error preloading customer index: {e}")
+
+# predictor.registry rather than .model: reading the model starts the reload
+# watcher thread, which must only run in the forked workers
+if not predictor.registry:
+    logger.error("❌ Models not loaded; prediction endpoints will return errors")
+
+# Move everything loaded so far out of the garbage collector's generations, so
+# collections in the workers do not write to (and un-share) these pages
+gc.freeze()
+
+application = app